@@ -1,54 +1,285 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 import numpy as np
-import calendar
+import os
+from dataclasses import dataclass
+
+import charts
+import export
+from helsa import instrument, metrics, periods, snapshot
+from helsa.loader import PARSER_VERSION, parse_csv
+from helsa.months import MONTH_MAP
+from helsa.provider import DataProvider, REFRESH_SECONDS
+from helsa.sources import Source, gviz_url, parse_spec
 
 # --- 1. KONFIGURASI DATA ---
 SHEET_ID = '18Djb0QiE8uMgt_nXljFCZaMKHwii1pMzAtH96zGc_cI'
-SHEET_NAME = 'app_data'
-URL = f'https://docs.google.com/spreadsheets/d/{SHEET_ID}/gviz/tq?tqx=out:csv&sheet={SHEET_NAME}'
+# Satu tab per tahun/wilayah: (nama tab, tahun, wilayah). Tahun/wilayah dipakai bila tab tidak memiliki kolomnya.
+SHEET_TABS = [('app_data', 2025, None)]
+SOURCES = [Source(gviz_url(SHEET_ID, tab), year=year, region=region, name=tab) for tab, year, region in SHEET_TABS]
+# Override: HELSA_SOURCES="url|tahun|wilayah; url2|tahun" atau satu URL lewat HELSA_SHEET_URL.
+if os.environ.get('HELSA_SOURCES'):
+    SOURCES = parse_spec(os.environ['HELSA_SOURCES'])
+elif os.environ.get('HELSA_SHEET_URL'):
+    SOURCES = [Source(os.environ['HELSA_SHEET_URL'], year=SHEET_TABS[0][1])]
+
+FIGURE_CACHE_SIZE = 64
+# Mode skala besar aktif otomatis bila cabang terpilih > SCALABLE_BRANCHES (bisa diubah di sidebar).
+SCALABLE_BRANCHES = int(os.environ.get('HELSA_SCALABLE_BRANCHES', 8))
+TOP_N = 10
+# Ekspor laporan ditulis ke HELSA_EXPORT_DIR; status dipoll selama ekspor berjalan.
+EXPORT_POLL_SECONDS = 2
+EXPORT_LIST_LIMIT = 20
+# Panel debug hanya bila operator menyetel HELSA_DEBUG=1: kontrolnya (rekam/reset) mengubah
+# metrik global yang juga dibaca endpoint Prometheus (HELSA_METRICS_PORT).
+DEBUG_PANEL = os.environ.get('HELSA_DEBUG') == '1'
+METRICS_PORT = int(os.environ.get('HELSA_METRICS_PORT', 0))
 
-st.set_page_config(page_title="Helsa-BR Performance Dashboard 2025", layout="wide")
+st.set_page_config(page_title="Helsa-BR Performance Dashboard", layout="wide")
 
-MONTH_MAP = {
-    'Januari': 1, 'Februari': 2, 'Maret': 3, 'April': 4, 'Mei': 5, 'Juni': 6,
-    'Juli': 7, 'Agustus': 8, 'September': 9, 'Oktober': 10, 'November': 11, 'Desember': 12
-}
+@st.cache_resource
+def get_provider():
+    return DataProvider(SOURCES, parse_csv, interval=REFRESH_SECONDS, version=PARSER_VERSION).start()
 
-@st.cache_data(ttl=300)
 def load_data():
-    try:
-        raw_df = pd.read_csv(URL)
-        raw_df.columns = raw_df.columns.str.strip()
-        numeric_cols = [
-            'Target Revenue', 'Actual Revenue (Total)', 'Actual Revenue (Opt)', 'Actual Revenue (Ipt)',
-            'Volume OPT JKN', 'Volume OPT Non JKN', 'Volume IPT JKN', 'Volume IPT Non JKN',
-            'Volume IGD JKN', 'Volume IGD Non JKN', 'Volume IGD to IPT JKN', 'Volume IGD to IPT Non JKN',
-            'Pintu Poli'
-        ]
-        for col in numeric_cols:
-            if col in raw_df.columns:
-                raw_df[col] = raw_df[col].astype(str).str.replace(r'[^\d.]', '', regex=True)
-                raw_df[col] = pd.to_numeric(raw_df[col], errors='coerce').fillna(0)
-            elif col == 'Pintu Poli':
-                raw_df[col] = 0
-        return raw_df
-    except Exception as e:
-        st.error(f"Gagal memuat data: {e}")
-        return pd.DataFrame()
-
-def count_days(year, month_name):
-    month_idx = MONTH_MAP.get(month_name, 1)
-    matrix = calendar.monthcalendar(year, month_idx)
-    mon_fri, saturdays = 0, 0
-    for week in matrix:
-        for d in range(0, 5): 
-            if week[d] != 0: mon_fri += 1
-        if week[5] != 0: saturdays += 1
-    return mon_fri, saturdays
-
-df = load_data()
+    provider = get_provider()
+    snap = provider.current()
+    if snap is None:
+        # Hanya terjadi saat cold start tanpa snapshot disk sama sekali.
+        with st.spinner("Memuat data..."):
+            provider.wait(snapshot.FETCH_TIMEOUT)
+        snap = provider.current()
+    if snap is None:
+        st.error(f"Gagal memuat data: {provider.last_error}")
+        return None
+    if snap.stale:
+        st.warning("Sumber data tidak dapat dijangkau, menampilkan snapshot terakhir.")
+    for name, error in snap.errors:
+        st.warning(f"Sumber '{name}' gagal dimuat dan dilewati: {error}")
+    return snap
+
+# Metrik turunan dihitung sekali per versi data (hash konten) dan dipakai bersama semua sesi.
+@st.cache_resource(max_entries=4)
+def get_metrics(version, _frame):
+    instrument.count('metrics_cache.miss')
+    return metrics.enrich(_frame)
+
+@st.cache_resource(max_entries=4)
+def get_period_index(version, _df):
+    return periods.PeriodIndex(_df)
+
+@st.cache_resource(max_entries=16)
+def get_top_branches(key, n, _df):
+    return metrics.top_branches(_df, n)
+
+@st.cache_resource
+def get_figure_cache():
+    return charts.FigureCache(maxsize=FIGURE_CACHE_SIZE)
+
+@st.cache_resource
+def get_exporter():
+    return export.Exporter()
+
+@st.cache_resource
+def start_metrics_endpoint(port):
+    return instrument.serve(port)
+
+def show_figure(fig, chart_id):
+    payload = len(fig.to_json()) if instrument.enabled() else 0
+    with instrument.span('plotly_chart', chart=chart_id, bytes=payload):
+        st.plotly_chart(fig, use_container_width=True)
+
+def toggle_recording():
+    instrument.enable(st.session_state['debug_metrics'])
+
+def debug_panel(snap, shared, view):
+    with st.sidebar.expander("🛠️ Debug & Instrumentasi"):
+        # Perekaman bersifat global (semua sesi): toggle menampilkan status global dan
+        # hanya mengubahnya saat diklik.
+        st.session_state['debug_metrics'] = instrument.enabled()
+        st.toggle("Rekam metrik", key="debug_metrics", on_change=toggle_recording)
+        st.caption(f"Versi data `{snap.digest[:12]}` · diambil {pd.Timestamp(snap.fetched_at, unit='s'):%Y-%m-%d %H:%M:%S} UTC")
+        stage_stats = instrument.stages()
+        if stage_stats:
+            st.dataframe(pd.DataFrame.from_dict(stage_stats, orient='index')[['count', 'avg_s', 'max_s', 'rows', 'bytes']])
+        st.json({'counters': instrument.counters(), 'figure_cache': get_figure_cache().stats(),
+                 'memory': metrics.memory_report(shared, view.df)})
+        st.download_button("Unduh log (JSONL)", instrument.export_jsonl(), file_name="helsa-metrics.jsonl")
+        if st.button("Reset metrik"):
+            instrument.reset()
+
+MIME = {'.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.html': 'text/html'}
+
+def export_panel(df, branches):
+    # Fragment dipoll hanya selama ekspor berjalan; selebihnya statis.
+    poll = EXPORT_POLL_SECONDS if get_exporter().running else None
+    with st.sidebar:
+        st.fragment(export_fragment, run_every=poll)(df, branches)
+
+def export_fragment(df, branches):
+    exporter = get_exporter()
+    status = exporter.status()
+    with st.expander("📦 Ekspor Laporan", expanded=status['running']):
+        labels = {int(p): periods.label(int(p)) for p in np.unique(df['Periode'])}
+        period = st.selectbox("Periode laporan:", list(labels)[::-1], format_func=labels.get, key="export_period")
+        st.caption(f"Workbook Excel & HTML untuk grup dan {len(branches)} cabang terpilih.")
+        if st.button("Buat Laporan", disabled=status['running'] or not branches):
+            exporter.start(df, period, branches)
+            st.rerun()
+        if status['running']:
+            st.session_state['export_polling'] = True
+            st.progress(status['done'] / max(status['total'], 1), text=f"{status['done']}/{status['total'] or '?'} laporan selesai")
+        elif st.session_state.pop('export_polling', False):
+            st.rerun()
+        if status['error'] is not None:
+            st.error(f"Ekspor gagal: {status['error']}")
+        for name, error in status['errors']:
+            st.warning(f"Laporan '{name}' gagal: {error}")
+        for path, size, mtime in exporter.listing()[:EXPORT_LIST_LIMIT]:
+            st.download_button(f"{path.name} · {size / 1024:,.0f} KB", path.read_bytes, file_name=path.name,
+                               mime=MIME.get(path.suffix), key=f"dl_{path.name}")
+
+# --- 2. SEKSI DASHBOARD ---
+# Setiap seksi adalah fragment: kontrol di dalamnya hanya me-rerun seksi itu sendiri.
+# Seksi di luar OPEN_SECTIONS baru dibangun & dikirim setelah dibuka pengguna.
+OPEN_SECTIONS = {'revenue', 'opt'}
+
+@dataclass(frozen=True)
+class View:
+    df: pd.DataFrame
+    branches: list
+    key: tuple
+    years_label: str
+    scalable: bool = False
+
+    def figure(self, chart_id, build):
+        return get_figure_cache().get_or_build((chart_id,) + self.key, build)
+
+def section_open(section_id):
+    if st.toggle("Tampilkan", value=section_id in OPEN_SECTIONS, key=f"open_{section_id}"):
+        return True
+    st.caption("Aktifkan untuk memuat grafik.")
+    return False
+
+def summary_footer(view, col_total, y_label, is_revenue):
+    summary = metrics.group_summary(view.df, col_total)
+    if summary.by_branch.empty:
+        return
+    by_branch = summary.by_branch.reindex(view.branches, fill_value=0)
+
+    def disp_v(val): return f"Rp {val/1e9:.2f} M" if is_revenue else f"{int(val):,} Pasien"
+
+    st.markdown(f"**Rata-rata {y_label} per Bulan:**")
+    cols = st.columns(len(view.branches) + 1)
+    for idx, cb in enumerate(view.branches):
+        with cols[idx]:
+            st.markdown(f"<span style='color:{charts.color(cb)['dark']};'>● <b>{cb}</b></span>", unsafe_allow_html=True)
+            st.write(disp_v(by_branch.at[cb, 'avg']))
+    cols[-1].markdown(f"### 🏆 Grup Avg\n**{disp_v(summary.group_avg)}**")
+
+    st.markdown(f"**Total {y_label} Keseluruhan:**")
+    cols2 = st.columns(len(view.branches) + 1)
+    for idx, cb in enumerate(view.branches):
+        with cols2[idx]:
+            st.markdown(f"<span style='color:{charts.color(cb)['dark']};'>● <b>{cb}</b></span>", unsafe_allow_html=True)
+            suffix = f" <br><small>({by_branch.at[cb, 'contribution']:.1f}% Kontr.)</small>" if is_revenue and summary.group_total > 0 else ""
+            st.markdown(f"{disp_v(by_branch.at[cb, 'total'])}{suffix}", unsafe_allow_html=True)
+    cols2[-1].markdown(f"### 🏛️ Grup Total\n**{disp_v(summary.group_total)}**")
+
+@st.fragment
+def stacked_section(view, section_id, title):
+    with st.container(border=True):
+        st.subheader(title)
+        if not section_open(section_id):
+            return
+        spec = charts.STACKED_CHARTS[section_id]
+        build = charts.build_stacked_compact if view.scalable else charts.build_stacked_figure
+        fig = view.figure(section_id, lambda: build(view.df, view.branches, **spec))
+        show_figure(fig, section_id)
+        if st.toggle("Ringkasan grup", value=True, key=f"summary_{section_id}"):
+            summary_footer(view, spec['col_total'], spec['y_label'], spec.get('is_revenue', False))
+
+@st.fragment
+def capacity_section(view):
+    with st.container(border=True):
+        st.subheader(f"⚙️ Analisis Kapasitas Produksi Rawat Jalan ({view.years_label})")
+        if not section_open('kapasitas'):
+            return
+        if not view.scalable:
+            fig_cap = view.figure('kapasitas', lambda: charts.build_capacity_figure(view.df, view.branches))
+        elif st.radio("Tampilan:", ["Batang", "Heatmap Utilisasi"], horizontal=True, key="cap_view") == "Batang":
+            fig_cap = view.figure('kapasitas', lambda: charts.build_capacity_compact(view.df, view.branches))
+        else:
+            fig_cap = view.figure('kapasitas:heatmap', lambda: charts.build_heatmap(view.df, view.branches, 'Utilisasi Poli', 'RdYlGn', '%'))
+        show_figure(fig_cap, 'kapasitas')
+
+CR_METRICS = {"CR (%)": 'CR IGD to IPT', "Volume Konversi": 'Total IGD to IPT'}
+
+@st.fragment
+def cr_section(view):
+    with st.container(border=True):
+        st.subheader("📊 Tren Conversion Rate (CR) IGD ke Ranap")
+        if not section_open('cr'):
+            return
+        metric = CR_METRICS[st.radio("Metrik:", list(CR_METRICS), horizontal=True, key="cr_metric")]
+        if not view.scalable:
+            fig_cr = view.figure(f'cr:{metric}', lambda: charts.build_cr_figure(view.df, view.branches, metric))
+        elif st.radio("Tampilan:", ["Heatmap", "Garis (WebGL)"], horizontal=True, key="cr_view") == "Heatmap":
+            suffix = '%' if metric == 'CR IGD to IPT' else ''
+            fig_cr = view.figure(f'cr:{metric}:heatmap', lambda: charts.build_heatmap(view.df, view.branches, metric, 'Blues', suffix))
+        else:
+            fig_cr = view.figure(f'cr:{metric}:webgl', lambda: charts.build_cr_figure(view.df, view.branches, metric, webgl=True))
+        show_figure(fig_cr, 'cr')
+
+if METRICS_PORT:
+    start_metrics_endpoint(METRICS_PORT)
+
+COMPARE_METRICS = {"Revenue": 'revenue', "Volume OPT": 'opt', "Volume IPT": 'ipt', "Volume IGD": 'igd', "Volume Konversi": 'igd_to_ipt'}
+
+@st.fragment
+def comparison_section(index, branches):
+    with st.container(border=True):
+        st.subheader("🔁 Perbandingan Periode")
+        labels = [periods.label(p) for p in index.periods()]
+        by_label = dict(zip(labels, index.periods()))
+        metric_name = st.selectbox("Metrik:", list(COMPARE_METRICS), key="cmp_metric")
+        metric = COMPARE_METRICS[metric_name]
+        is_revenue = metric == 'revenue'
+        n = len(labels)
+        c1, c2 = st.columns(2)
+        a = c1.select_slider("Periode A", labels, value=(labels[max(n - 3, 0)], labels[-1]), key="cmp_a")
+        b = c2.select_slider("Periode B", labels, value=(labels[max(n - 6, 0)], labels[max(n - 4, 0)]), key="cmp_b")
+        range_a, range_b = (by_label[a[0]], by_label[a[1]]), (by_label[b[0]], by_label[b[1]])
+
+        table = index.compare(metric, range_a, range_b).reindex(branches)
+        group = table[['A', 'B']].sum()
+        table.loc['Grup'] = [group['A'], group['B'], (group['A'] / group['B'] - 1) * 100 if group['B'] else np.nan]
+        if is_revenue:
+            for name, rng in (('Ach A (%)', range_a), ('Ach B (%)', range_b)):
+                revenue, target = index.total('revenue', *rng).reindex(branches), index.total('target', *rng).reindex(branches)
+                revenue['Grup'], target['Grup'] = revenue.sum(), target.sum()
+                table[name] = revenue / target.where(target > 0) * 100
+        scale = 1e9 if is_revenue else 1
+        table[['A', 'B']] = table[['A', 'B']] / scale
+        value_fmt = "Rp %.2f M" if is_revenue else "%d"
+        st.dataframe(table, use_container_width=True, column_config={
+            'A': st.column_config.NumberColumn(f"{a[0]} – {a[1]}", format=value_fmt),
+            'B': st.column_config.NumberColumn(f"{b[0]} – {b[1]}", format=value_fmt),
+            'Perubahan (%)': st.column_config.NumberColumn(format="%.1f%%"),
+            'Ach A (%)': st.column_config.NumberColumn(format="%.1f%%"),
+            'Ach B (%)': st.column_config.NumberColumn(format="%.1f%%"),
+        })
+
+        last = index.last
+        quick = pd.DataFrame({
+            'YTD': index.ytd(metric, last), 'QTD': index.qtd(metric, last), '3 Bulan Terakhir': index.rolling(metric, last, 3),
+        }).reindex(branches).sum() / scale
+        st.caption(f"Per {periods.label(last)} (grup): " + " · ".join(
+            f"{k} {f'Rp {v:.2f} M' if is_revenue else f'{int(v):,}'}" for k, v in quick.items()))
+
+snap = load_data()
+instrument.count('metrics_cache.call')
+df = get_metrics(snap.digest, snap.frame) if snap is not None else pd.DataFrame()
 
 if not df.empty:
     st.sidebar.header("🕹️ Panel Kontrol")
@@ -59,153 +290,39 @@ if not df.empty:
     available_months = [m for m in month_order if m in df['Bulan'].unique()]
     selected_months = st.sidebar.multiselect("Pilih Periode Bulan:", available_months, default=available_months)
     
-    filtered_df = df[(df['Cabang'].isin(selected_cabang)) & (df['Bulan'].isin(selected_months))].copy()
-    filtered_df['Bulan'] = pd.Categorical(filtered_df['Bulan'], categories=selected_months, ordered=True)
-    filtered_df = filtered_df.sort_values(['Cabang', 'Bulan'])
-
-    # --- PERHITUNGAN METRIK ---
-    filtered_df['Total OPT'] = filtered_df['Volume OPT JKN'] + filtered_df['Volume OPT Non JKN']
-    filtered_df['Total IPT'] = filtered_df['Volume IPT JKN'] + filtered_df['Volume IPT Non JKN']
-    filtered_df['Total IGD'] = filtered_df['Volume IGD JKN'] + filtered_df['Volume IGD Non JKN']
-    filtered_df['Total IGD to IPT'] = filtered_df['Volume IGD to IPT JKN'] + filtered_df['Volume IGD to IPT Non JKN']
-    filtered_df['CR IGD to IPT'] = np.where(filtered_df['Total IGD'] > 0, (filtered_df['Total IGD to IPT'] / filtered_df['Total IGD']) * 100, 0)
-    
-    capacity_data = []
-    for _, row in filtered_df.iterrows():
-        mf, sat = count_days(2025, row['Bulan'])
-        pintu = row['Pintu Poli']
-        monthly_cap = (mf * (pintu * 12 * 5)) + (sat * (pintu * 4 * 5))
-        capacity_data.append(monthly_cap)
-    
-    filtered_df['Kapasitas Maks'] = capacity_data
-    filtered_df['Utilisasi Poli'] = np.where(filtered_df['Kapasitas Maks'] > 0, (filtered_df['Total OPT'] / filtered_df['Kapasitas Maks']) * 100, 0)
+    all_years = sorted(df['Tahun'].unique().tolist())
+    selected_years = st.sidebar.multiselect("Pilih Tahun:", all_years, default=all_years) if len(all_years) > 1 else all_years
+    years_label = f"{min(selected_years)}–{max(selected_years)}" if len(selected_years) > 1 else ''.join(map(str, selected_years))
 
-    for col in ['Actual Revenue (Total)', 'Total OPT', 'Total IPT', 'Total IGD', 'Total IGD to IPT']:
-        filtered_df[f'{col}_Growth'] = filtered_df.groupby('Cabang', observed=True)[col].pct_change() * 100
+    filtered_df = metrics.select(df, selected_cabang, selected_months, selected_years)
+    key = (tuple(selected_cabang), tuple(selected_months), tuple(selected_years), snap.digest)
+    # Tanpa key: nilai default ikut berubah saat jumlah cabang melewati ambang.
+    scalable = st.sidebar.toggle("Mode Skala Besar", value=len(selected_cabang) > SCALABLE_BRANCHES,
+                                 help="Top-N cabang + 'Lainnya', satu trace per lapisan, heatmap/WebGL untuk CR & utilisasi.")
+    if scalable:
+        top_n = st.sidebar.slider("Top-N cabang (sisanya digabung):", 3, 25, TOP_N)
+        key += ('top', top_n)
+        chart_df, chart_branches = get_top_branches(key, top_n, filtered_df)
+        view = View(chart_df, chart_branches, key, years_label, scalable=True)
+    else:
+        view = View(filtered_df, selected_cabang, key, years_label)
 
-    st.title("📊 Dashboard Performa Helsa-BR 2025")
-    
-    colors = {
-        'Jatirahayu': {'base': '#AEC6CF', 'light': '#D1E1E6', 'dark': '#779ECB'},
-        'Cikampek':   {'base': '#FFB7B2', 'light': '#FFD1CF', 'dark': '#E08E88'},
-        'Citeureup':  {'base': '#B2F2BB', 'light': '#D5F9DA', 'dark': '#88C090'},
-        'Ciputat':    {'base': '#CFC1FF', 'light': '#E1D9FF', 'dark': '#A694FF'}
-    }
-
-    def create_stacked_chart(df_data, title, col_top, col_bottom, col_total, col_growth_name, y_label, is_revenue=False, target_col=None):
-        with st.container(border=True):
-            st.subheader(title)
-            fig = go.Figure()
-            for cb in selected_cabang:
-                branch_df = df_data[df_data['Cabang'] == cb].copy()
-                if branch_df.empty: continue
-                
-                # Format string untuk hover total
-                branch_df['total_fmt'] = branch_df[col_total].apply(lambda x: f"Rp {x/1e9:.2f} M" if is_revenue else f"{int(x):,} Pasien")
-                
-                # Customdata: [Total Raw, Growth, Achievement, Total Formatted]
-                ach_series = (branch_df[col_total] / branch_df[target_col] * 100).fillna(0) if target_col else np.zeros(len(branch_df))
-                h_customdata = np.stack([branch_df[col_total], branch_df[col_growth_name].fillna(0), ach_series, branch_df['total_fmt']], axis=-1)
-
-                h_template = f"<b>{cb}</b><br>Total: %{{customdata[3]}}<br>"
-                if target_col: h_template += "Ach: %{customdata[2]:.1f}%<br>"
-                h_template += "Growth: %{customdata[1]:.1f}%<extra></extra>"
-
-                def fmt_txt(val, cat):
-                    if val == 0: return ""
-                    val_str = f"{val/1e9:.2f}M" if is_revenue else f"{int(val):,}"
-                    return f"<b>{val_str}</b><br>({cat})"
-
-                fig.add_trace(go.Bar(x=branch_df['Bulan'], y=branch_df[col_bottom], name=cb, legendgroup=cb, offsetgroup=cb, marker_color=colors.get(cb)['light'], customdata=h_customdata, text=branch_df[col_bottom].apply(lambda x: fmt_txt(x, "Opt" if is_revenue else "Non JKN")), textposition='inside', textangle=0, hovertemplate=h_template))
-                fig.add_trace(go.Bar(x=branch_df['Bulan'], y=branch_df[col_top], name=cb, legendgroup=cb, showlegend=False, base=branch_df[col_bottom], offsetgroup=cb, marker_color=colors.get(cb)['dark'], customdata=h_customdata, text=branch_df[col_top].apply(lambda x: fmt_txt(x, "Ipt" if is_revenue else "JKN")), textposition='inside', textangle=0, hovertemplate=h_template))
-                
-                display_labels = []
-                for idx in range(len(branch_df)):
-                    g_val = branch_df[col_growth_name].iloc[idx]
-                    g_txt = f"<span style='color:{('#059669' if g_val >= 0 else '#dc2626')}'><b>{('▲' if g_val >= 0 else '▼')} {abs(g_val):.1f}%</b></span>"
-                    if target_col:
-                        ach = ach_series.iloc[idx]
-                        ach_txt = f"<span style='color:{('#059669' if ach >= 100 else '#dc2626')}'><b>{ach:.1f}%</b></span>"
-                        display_labels.append(f"{ach_txt}<br>{g_txt}")
-                    else: display_labels.append(g_txt)
-
-                fig.add_trace(go.Bar(x=branch_df['Bulan'], y=branch_df[col_total], offsetgroup=cb, showlegend=False, text=display_labels, textposition='outside', textfont=dict(size=14), marker_color='rgba(0,0,0,0)', hoverinfo='skip', cliponaxis=False))
-
-            max_v = df_data[col_total].max() if not df_data.empty else 0
-            y_limit = max_v * 1.25 if max_v > 0 else 100
-            yaxis_config = dict(title=y_label, range=[0, y_limit])
-            if is_revenue:
-                ticks = np.arange(0, y_limit + 1e9, 1e9)
-                fig.update_yaxes(tickvals=ticks, ticktext=[f"{int(v/1e9)}M" for v in ticks])
-            fig.update_layout(barmode='group', height=520, margin=dict(t=120, b=10), yaxis=yaxis_config, legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # --- SUMMARY FOOTER (GRUP AVG & TOTAL) ---
-            df_ok = df_data[df_data[col_total] > 0]
-            if not df_ok.empty:
-                avg_branch = df_ok.groupby('Cabang', observed=True)[col_total].mean()
-                sum_branch = df_ok.groupby('Cabang', observed=True)[col_total].sum()
-                monthly_group_totals = df_ok.groupby('Bulan', observed=True)[col_total].sum()
-                group_avg = monthly_group_totals.mean() 
-                group_total = sum_branch.sum()
-
-                def disp_v(val): return f"Rp {val/1e9:.2f} M" if is_revenue else f"{int(val):,} Pasien"
-
-                st.markdown(f"**Rata-rata {y_label} per Bulan:**")
-                cols = st.columns(len(selected_cabang) + 1)
-                for idx, cb in enumerate(selected_cabang):
-                    with cols[idx]:
-                        st.markdown(f"<span style='color:{colors.get(cb)['dark']};'>● <b>{cb}</b></span>", unsafe_allow_html=True)
-                        st.write(disp_v(avg_branch.get(cb, 0)))
-                cols[-1].markdown(f"### 🏆 Grup Avg\n**{disp_v(group_avg)}**")
-
-                st.markdown(f"**Total {y_label} Keseluruhan:**")
-                cols2 = st.columns(len(selected_cabang) + 1)
-                for idx, cb in enumerate(selected_cabang):
-                    with cols2[idx]:
-                        st.markdown(f"<span style='color:{colors.get(cb)['dark']};'>● <b>{cb}</b></span>", unsafe_allow_html=True)
-                        val = sum_branch.get(cb, 0)
-                        suffix = f" <br><small>({(val/group_total*100):.1f}% Kontr.)</small>" if is_revenue and group_total > 0 else ""
-                        st.markdown(f"{disp_v(val)}{suffix}", unsafe_allow_html=True)
-                cols2[-1].markdown(f"### 🏛️ Grup Total\n**{disp_v(group_total)}**")
+    if DEBUG_PANEL:
+        debug_panel(snap, df, view)
+    export_panel(df, selected_cabang)
 
-    # --- EKSEKUSI GRAFIK ---
-    create_stacked_chart(filtered_df, "📈 Realisasi Revenue (Opt vs Ipt)", 'Actual Revenue (Ipt)', 'Actual Revenue (Opt)', 'Actual Revenue (Total)', 'Actual Revenue (Total)_Growth', "Revenue", is_revenue=True, target_col='Target Revenue')
-    create_stacked_chart(filtered_df, "👥 Volume Outpatient (OPT)", 'Volume OPT JKN', 'Volume OPT Non JKN', 'Total OPT', 'Total OPT_Growth', "Volume OPT")
-    
-    # --- ANALISIS KAPASITAS RAJAL ---
-    with st.container(border=True):
-        st.subheader("⚙️ Analisis Kapasitas Produksi Rawat Jalan (2025)")
-        fig_cap = go.Figure()
-        for cb in selected_cabang:
-            branch_df = filtered_df[filtered_df['Cabang'] == cb]
-            if branch_df.empty: continue
-            
-            # Bar: Kapasitas Maks. Per Bulan
-            fig_cap.add_trace(go.Bar(x=branch_df['Bulan'], y=branch_df['Kapasitas Maks'], name=f"Kapasitas Maks. ({cb})", offsetgroup=cb, marker_color=colors.get(cb)['light'], text=branch_df['Kapasitas Maks'].apply(lambda x: f"<b>{int(x):,}</b>"), textposition='inside', textangle=0, hovertemplate=f"<b>{cb}</b><br>Kapasitas Maks: %{{y:,.0f}}<extra></extra>"))
-            
-            # Line: Volume Rajal Aktual (Nilai dimunculkan)
-            fig_cap.add_trace(go.Scatter(x=branch_df['Bulan'], y=branch_df['Total OPT'], name=f"Volume Rajal ({cb})", mode='markers+lines+text', offsetgroup=cb, text=branch_df['Total OPT'].apply(lambda x: f"<b>{int(x):,}</b>"), textposition="top center", line=dict(color=colors.get(cb)['dark'], width=3), hovertemplate=f"<b>{cb}</b><br>Volume Rajal: %{{y:,.0f}}<extra></extra>"))
-
-            # Label Atas: Utilisasi (%)
-            fig_cap.add_trace(go.Bar(x=branch_df['Bulan'], y=branch_df['Kapasitas Maks'], offsetgroup=cb, showlegend=False, text=branch_df['Utilisasi Poli'].apply(lambda x: f"<b>{x:.1f}%</b>"), textposition='outside', textfont=dict(size=14), marker_color='rgba(0,0,0,0)', hoverinfo='skip', cliponaxis=False))
-        
-        y_max = filtered_df['Kapasitas Maks'].max() if not filtered_df.empty else 100
-        fig_cap.update_layout(barmode='group', height=520, margin=dict(t=100, b=10), yaxis=dict(title="Jumlah Pasien", range=[0, y_max * 1.25]), legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-        st.plotly_chart(fig_cap, use_container_width=True)
-
-    create_stacked_chart(filtered_df, "🏥 Volume Inpatient (Ranap)", 'Volume IPT JKN', 'Volume IPT Non JKN', 'Total IPT', 'Total IPT_Growth', "Volume IPT")
-    create_stacked_chart(filtered_df, "🚑 Volume IGD", 'Volume IGD JKN', 'Volume IGD Non JKN', 'Total IGD', 'Total IGD_Growth', "Volume IGD")
-    create_stacked_chart(filtered_df, "🎯 Volume Konversi IGD ke Rawat Inap (Ranap)", 'Volume IGD to IPT JKN', 'Volume IGD to IPT Non JKN', 'Total IGD to IPT', 'Total IGD to IPT_Growth', "Volume Konversi")
+    st.title(f"📊 Dashboard Performa Helsa-BR {years_label}")
 
-    with st.container(border=True):
-        st.subheader("📊 Tren Conversion Rate (CR) IGD ke Ranap")
-        fig_cr = go.Figure()
-        for cb in selected_cabang:
-            branch_df = filtered_df[filtered_df['Cabang'] == cb]
-            if not branch_df.empty:
-                fig_cr.add_trace(go.Scatter(x=branch_df['Bulan'], y=branch_df['CR IGD to IPT'], name=cb, mode='lines+markers+text', text=branch_df['CR IGD to IPT'].apply(lambda x: f"<b>{x:.1f}%</b>" if x > 0 else ""), textposition="top center", line=dict(color=colors.get(cb)['dark'], width=3)))
-        fig_cr.update_layout(height=400, yaxis_title="Persentase (%)", yaxis=dict(range=[0, 115]), legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-        st.plotly_chart(fig_cr, use_container_width=True)
+    if st.sidebar.toggle("Mode Perbandingan Periode", key="compare_mode"):
+        comparison_section(get_period_index(snap.digest, df), selected_cabang)
+
+    # --- EKSEKUSI GRAFIK ---
+    stacked_section(view, 'revenue', "📈 Realisasi Revenue (Opt vs Ipt)")
+    stacked_section(view, 'opt', "👥 Volume Outpatient (OPT)")
+    capacity_section(view)
+    stacked_section(view, 'ipt', "🏥 Volume Inpatient (Ranap)")
+    stacked_section(view, 'igd', "🚑 Volume IGD")
+    stacked_section(view, 'konversi', "🎯 Volume Konversi IGD ke Rawat Inap (Ranap)")
+    cr_section(view)
 else:
     st.warning("Data tidak tersedia.")
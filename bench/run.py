@@ -0,0 +1,138 @@
+"""Benchmark per tahap dashboard, sepenuhnya offline.
+
+    python -m bench.run --branches 40 --years 2024 2025 --repeat 5 --out bench.json
+
+Hasil ditulis sebagai JSON (satu objek per tahap) agar bisa dibandingkan antar commit.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench.synth import generate
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def timed(fn, repeat):
+    """Jalankan ``fn`` ``repeat`` kali; kembalikan (hasil terakhir, daftar durasi detik)."""
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def stage(name, times, **extra):
+    return {'stage': name, 'median_s': statistics.median(times), 'min_s': min(times), 'runs': len(times), **extra}
+
+
+def bench_pipeline(raw, repeat):
+    import charts
+    from helsa import capacity, metrics
+    from helsa.loader import parse_csv
+
+    results = []
+    df, times = timed(lambda: parse_csv(raw), repeat)
+    results.append(stage('load_data.parse', times, rows=len(df), bytes=len(raw)))
+
+    enriched, times = timed(lambda: metrics.enrich(df), repeat)
+    results.append(stage('metrics.enrich', times, rows=len(enriched)))
+    wide = metrics.enrich(df, compact=False)
+    branch_subset = list(enriched['Cabang'].unique())[:max(1, enriched['Cabang'].nunique() // 2)]
+    results.append({'stage': 'memory', 'parsed_bytes': metrics.memory_usage(df), 'enriched_wide_bytes': metrics.memory_usage(wide),
+                    **metrics.memory_report(enriched, metrics.select(enriched)),
+                    'subset_session_bytes': metrics.memory_usage(metrics.select(enriched, branch_subset))})
+    _, times = timed(lambda: capacity.capacity(enriched), repeat)
+    results.append(stage('metrics.capacity', times, rows=len(enriched)))
+    _, times = timed(lambda: [metrics.growth(enriched, c) for c in metrics.GROWTH_COLS], repeat)
+    results.append(stage('metrics.growth', times, rows=len(enriched)))
+
+    branches = list(enriched['Cabang'].unique())
+    builders = {cid: (lambda spec=spec: charts.build_stacked_figure(enriched, branches, **spec)) for cid, spec in charts.STACKED_CHARTS.items()}
+    builders['kapasitas'] = lambda: charts.build_capacity_figure(enriched, branches)
+    builders['cr'] = lambda: charts.build_cr_figure(enriched, branches)
+    # Mode skala besar: top-10 + "Lainnya", satu trace per lapisan, heatmap untuk CR & utilisasi.
+    top, top_branches = metrics.top_branches(enriched, 10)
+    for cid, spec in charts.STACKED_CHARTS.items():
+        builders[f'compact.{cid}'] = lambda spec=spec: charts.build_stacked_compact(top, top_branches, **spec)
+    builders['compact.kapasitas'] = lambda: charts.build_capacity_compact(top, top_branches)
+    builders['heatmap.utilisasi'] = lambda: charts.build_heatmap(top, top_branches, 'Utilisasi Poli', 'RdYlGn', '%')
+    builders['heatmap.cr'] = lambda: charts.build_heatmap(top, top_branches, 'CR IGD to IPT', 'Blues', '%')
+    for cid, build in builders.items():
+        fig, times = timed(build, repeat)
+        payload, json_times = timed(fig.to_json, repeat)
+        results.append(stage(f'chart.{cid}', times, traces=len(fig.data), json_bytes=len(payload),
+                             json_median_s=statistics.median(json_times)))
+    return results
+
+
+def bench_rerun(source, repeat):
+    """Rerun skrip penuh lewat ``streamlit.testing`` (cold lalu warm)."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return [{'stage': 'app.rerun', 'skipped': 'streamlit tidak terpasang'}]
+
+    with tempfile.TemporaryDirectory() as snap_dir:
+        os.environ['HELSA_SHEET_URL'] = source.as_uri()
+        os.environ['HELSA_SNAPSHOT_DIR'] = snap_dir
+        at = AppTest.from_file(str(ROOT / 'app.py'), default_timeout=300)
+        _, cold = timed(at.run, 1)
+        if at.exception:
+            return [{'stage': 'app.rerun', 'error': [e.value for e in at.exception]}]
+        for toggle in at.toggle:
+            if toggle.key and toggle.key.startswith('open_'):
+                toggle.set_value(True)
+        _, warm = timed(at.run, repeat)
+        return [stage('app.rerun.cold', cold), stage('app.rerun.warm', warm, charts=len(at.get('plotly_chart')))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--branches', type=int, default=4)
+    parser.add_argument('--years', type=int, nargs='+', default=[2025])
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-app', action='store_true', help="lewati tahap rerun Streamlit")
+    parser.add_argument('--out', help="tulis JSON ke file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    raw = generate(args.branches, tuple(args.years), args.months, args.seed)
+    results = bench_pipeline(raw, args.repeat)
+    if not args.no_app:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / 'app_data.csv'
+            source.write_bytes(raw)
+            results += bench_rerun(source, args.repeat)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'params': vars(args),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Generator dataset sintetis berbentuk sheet ``app_data``."""
+import csv
+import io
+import random
+
+from helsa.months import MONTH_MAP
+from helsa.schema import NUMERIC_COLS
+
+KNOWN_BRANCHES = ['Jatirahayu', 'Cikampek', 'Citeureup', 'Ciputat']
+
+
+def branch_names(n):
+    return (KNOWN_BRANCHES + [f"Cabang {i:02d}" for i in range(len(KNOWN_BRANCHES) + 1, n + 1)])[:n]
+
+
+def _fmt(value, rng, rupiah):
+    """Tulis angka dengan salah satu format yang muncul di ekspor sheet."""
+    style = rng.random()
+    if style < 0.02:
+        return ''
+    if rupiah and style < 0.35:
+        return 'Rp ' + f"{value:,}".replace(',', '.')
+    if style < 0.55:
+        return f"{value:,}".replace(',', '.')
+    if style < 0.8:
+        return f"{value:,}"
+    if style < 0.9:
+        return f" {value} "
+    return str(value)
+
+
+def generate(branches=4, years=(2025,), months=12, seed=0, with_year=None):
+    """CSV (bytes) untuk ``branches`` cabang x ``years`` x ``months`` bulan."""
+    rng = random.Random(seed)
+    with_year = len(years) > 1 if with_year is None else with_year
+    header = ['Cabang', 'Bulan'] + (['Tahun'] if with_year else []) + NUMERIC_COLS
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    month_names = list(MONTH_MAP)[:months]
+    for cb in branch_names(branches):
+        pintu = rng.randint(3, 10)
+        for year in years:
+            for month in month_names:
+                opt = [rng.randint(300, 1500), rng.randint(200, 900)]
+                ipt = [rng.randint(80, 400), rng.randint(40, 250)]
+                igd = [rng.randint(150, 600), rng.randint(80, 350)]
+                conv = [rng.randint(10, igd[0] // 3), rng.randint(5, igd[1] // 3)]
+                rev_opt, rev_ipt = sum(opt) * rng.randint(400, 900) * 1000, sum(ipt) * rng.randint(2500, 6000) * 1000
+                target = int((rev_opt + rev_ipt) * rng.uniform(0.8, 1.3))
+                values = [target, rev_opt + rev_ipt, rev_opt, rev_ipt] + opt + ipt + igd + conv + [pintu]
+                row = [cb, month] + ([year] if with_year else [])
+                row += [_fmt(v, rng, i < 4) for i, v in enumerate(values)]
+                writer.writerow(row)
+    return buf.getvalue().encode('utf-8')
@@ -0,0 +1,310 @@
+import colorsys
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from helsa import instrument
+from helsa.metrics import OTHERS
+
+COLORS = {
+    'Jatirahayu': {'base': '#AEC6CF', 'light': '#D1E1E6', 'dark': '#779ECB'},
+    'Cikampek':   {'base': '#FFB7B2', 'light': '#FFD1CF', 'dark': '#E08E88'},
+    'Citeureup':  {'base': '#B2F2BB', 'light': '#D5F9DA', 'dark': '#88C090'},
+    'Ciputat':    {'base': '#CFC1FF', 'light': '#E1D9FF', 'dark': '#A694FF'}
+}
+DEFAULT_COLOR = {'base': '#D3D3D3', 'light': '#E5E5E5', 'dark': '#A9A9A9'}
+# Batas sel heatmap yang masih diberi label angka.
+HEATMAP_TEXT_CELLS = 400
+# Argumen build_stacked_figure per seksi (dipakai dashboard & benchmark).
+STACKED_CHARTS = {
+    'revenue': dict(col_top='Actual Revenue (Ipt)', col_bottom='Actual Revenue (Opt)', col_total='Actual Revenue (Total)', col_growth_name='Actual Revenue (Total)_Growth', y_label="Revenue", is_revenue=True, target_col='Target Revenue'),
+    'opt': dict(col_top='Volume OPT JKN', col_bottom='Volume OPT Non JKN', col_total='Total OPT', col_growth_name='Total OPT_Growth', y_label="Volume OPT"),
+    'ipt': dict(col_top='Volume IPT JKN', col_bottom='Volume IPT Non JKN', col_total='Total IPT', col_growth_name='Total IPT_Growth', y_label="Volume IPT"),
+    'igd': dict(col_top='Volume IGD JKN', col_bottom='Volume IGD Non JKN', col_total='Total IGD', col_growth_name='Total IGD_Growth', y_label="Volume IGD"),
+    'konversi': dict(col_top='Volume IGD to IPT JKN', col_bottom='Volume IGD to IPT Non JKN', col_total='Total IGD to IPT', col_growth_name='Total IGD to IPT_Growth', y_label="Volume Konversi"),
+}
+GOOD, BAD = '#059669', '#dc2626'
+LEGEND = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+
+
+def color(cb):
+    """Warna cabang: palet tetap untuk cabang yang dikenal, abu-abu untuk "Lainnya",
+    dan warna hasil generate (stabil per nama) untuk cabang lain."""
+    if cb in COLORS:
+        return COLORS[cb]
+    if cb == OTHERS:
+        return DEFAULT_COLOR
+    return _generated_color(str(cb))
+
+
+@functools.lru_cache(maxsize=None)
+def _generated_color(name):
+    hue = int(hashlib.md5(name.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+    def hls(lightness, saturation):
+        r, g, b = colorsys.hls_to_rgb(hue, lightness, saturation)
+        return f'#{round(r * 255):02X}{round(g * 255):02X}{round(b * 255):02X}'
+
+    return {'base': hls(0.80, 0.55), 'light': hls(0.88, 0.55), 'dark': hls(0.62, 0.45)}
+
+
+def fmt_values(values, is_revenue):
+    """Format angka untuk label: ``1.23M`` (revenue) atau ``1,234`` (volume)."""
+    values = np.asarray(values, dtype=float)
+    if is_revenue:
+        return np.char.mod('%.2fM', values / 1e9)
+    return np.array([f"{v:,}" for v in values.astype(np.int64).tolist()], dtype=str)
+
+
+def fmt_display(values, is_revenue):
+    values = np.asarray(values, dtype=float)
+    if is_revenue:
+        return np.char.mod('Rp %.2f M', values / 1e9)
+    return np.char.add(fmt_values(values, False), ' Pasien')
+
+
+def segment_labels(values, category, is_revenue):
+    txt = np.char.add(np.char.add('<b>', fmt_values(values, is_revenue)), f'</b><br>({category})')
+    return np.where(np.asarray(values) == 0, '', txt)
+
+
+def colored_pct(values, ok, arrow=False):
+    color = np.where(ok, GOOD, BAD)
+    pct = np.char.mod('%.1f%%', np.abs(values) if arrow else values)
+    if arrow:
+        pct = np.char.add(np.where(ok, '▲ ', '▼ '), pct)
+    return np.char.add(np.char.add(np.char.add("<span style='color:", color), "'><b>"), np.char.add(pct, '</b></span>'))
+
+
+def revenue_ticks(fig, y_limit, max_ticks=12):
+    """Tick sumbu revenue dalam miliar ("M"), per 1M atau kelipatannya bila rentangnya besar."""
+    step = 1e9 * max(1, int(np.ceil(y_limit / 1e9 / max_ticks)))
+    ticks = np.arange(0, y_limit + step, step)
+    fig.update_yaxes(tickvals=ticks, ticktext=[f"{int(v/1e9)}M" for v in ticks])
+
+
+def partition(df_data, branches):
+    """Posisi baris per cabang dari satu kali groupby, urut sesuai ``branches``."""
+    idx = df_data.groupby('Cabang', sort=False, observed=True).indices
+    return [(cb, idx[cb]) for cb in branches if cb in idx]
+
+
+def build_stacked_figure(df_data, branches, col_top, col_bottom, col_total, col_growth_name, y_label, is_revenue=False, target_col=None):
+    fig = go.Figure()
+    # Seluruh label dibangun sekali untuk semua baris, lalu diiris per cabang.
+    x = df_data['Label'].to_numpy()
+    top, bottom, total = (df_data[c].to_numpy() for c in (col_top, col_bottom, col_total))
+    # Growth NaN (bulan pertama / tanpa data bulan lalu) tidak diberi label.
+    growth = df_data[col_growth_name].to_numpy(dtype=float)
+    known = ~np.isnan(growth)
+    if target_col:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ach = np.nan_to_num(total / df_data[target_col].to_numpy() * 100, nan=0.0)
+    else:
+        ach = np.zeros(len(df_data))
+    # Customdata: [Total Raw, Growth Formatted, Achievement, Total Formatted]
+    customdata = np.empty((len(df_data), 4), dtype=object)
+    customdata[:, 0], customdata[:, 1], customdata[:, 2], customdata[:, 3] = total, np.where(known, np.char.mod('%.1f%%', growth), '–'), ach, fmt_display(total, is_revenue)
+    bottom_txt = segment_labels(bottom, "Opt" if is_revenue else "Non JKN", is_revenue)
+    top_txt = segment_labels(top, "Ipt" if is_revenue else "JKN", is_revenue)
+    labels = np.where(known, colored_pct(growth, growth >= 0, arrow=True), '')
+    if target_col:
+        ach_txt = colored_pct(ach, ach >= 100)
+        labels = np.where(known, np.char.add(np.char.add(ach_txt, '<br>'), labels), ach_txt)
+
+    for cb, pos in partition(df_data, branches):
+        h_template = f"<b>{cb}</b><br>Total: %{{customdata[3]}}<br>"
+        if target_col: h_template += "Ach: %{customdata[2]:.1f}%<br>"
+        h_template += "Growth: %{customdata[1]}<extra></extra>"
+
+        fig.add_trace(go.Bar(x=x[pos], y=bottom[pos], name=cb, legendgroup=cb, offsetgroup=cb, marker_color=color(cb)['light'], customdata=customdata[pos], text=bottom_txt[pos], textposition='inside', textangle=0, hovertemplate=h_template))
+        fig.add_trace(go.Bar(x=x[pos], y=top[pos], name=cb, legendgroup=cb, showlegend=False, base=bottom[pos], offsetgroup=cb, marker_color=color(cb)['dark'], customdata=customdata[pos], text=top_txt[pos], textposition='inside', textangle=0, hovertemplate=h_template))
+        fig.add_trace(go.Bar(x=x[pos], y=total[pos], offsetgroup=cb, showlegend=False, text=labels[pos], textposition='outside', textfont=dict(size=14), marker_color='rgba(0,0,0,0)', hoverinfo='skip', cliponaxis=False))
+
+    max_v = total.max() if len(total) else 0
+    y_limit = max_v * 1.25 if max_v > 0 else 100
+    yaxis_config = dict(title=y_label, range=[0, y_limit])
+    if is_revenue:
+        revenue_ticks(fig, y_limit)
+    fig.update_layout(barmode='group', height=520, margin=dict(t=120, b=10), yaxis=yaxis_config, legend=LEGEND)
+    return fig
+
+
+def build_capacity_figure(df_data, branches):
+    fig = go.Figure()
+    x = df_data['Label'].to_numpy()
+    cap, opt = df_data['Kapasitas Maks'].to_numpy(), df_data['Total OPT'].to_numpy()
+    cap_txt = np.char.add(np.char.add('<b>', fmt_values(cap, False)), '</b>')
+    opt_txt = np.char.add(np.char.add('<b>', fmt_values(opt, False)), '</b>')
+    util_txt = np.char.mod('<b>%.1f%%</b>', df_data['Utilisasi Poli'].to_numpy(dtype=float))
+
+    for cb, pos in partition(df_data, branches):
+        # Bar: Kapasitas Maks. Per Bulan
+        fig.add_trace(go.Bar(x=x[pos], y=cap[pos], name=f"Kapasitas Maks. ({cb})", offsetgroup=cb, marker_color=color(cb)['light'], text=cap_txt[pos], textposition='inside', textangle=0, hovertemplate=f"<b>{cb}</b><br>Kapasitas Maks: %{{y:,.0f}}<extra></extra>"))
+        # Line: Volume Rajal Aktual (Nilai dimunculkan)
+        fig.add_trace(go.Scatter(x=x[pos], y=opt[pos], name=f"Volume Rajal ({cb})", mode='markers+lines+text', offsetgroup=cb, text=opt_txt[pos], textposition="top center", line=dict(color=color(cb)['dark'], width=3), hovertemplate=f"<b>{cb}</b><br>Volume Rajal: %{{y:,.0f}}<extra></extra>"))
+        # Label Atas: Utilisasi (%)
+        fig.add_trace(go.Bar(x=x[pos], y=cap[pos], offsetgroup=cb, showlegend=False, text=util_txt[pos], textposition='outside', textfont=dict(size=14), marker_color='rgba(0,0,0,0)', hoverinfo='skip', cliponaxis=False))
+
+    y_max = cap.max() if len(cap) else 100
+    fig.update_layout(barmode='group', height=520, margin=dict(t=100, b=10), yaxis=dict(title="Jumlah Pasien", range=[0, y_max * 1.25]), legend=LEGEND)
+    return fig
+
+
+def build_cr_figure(df_data, branches, col='CR IGD to IPT', webgl=False):
+    """Tren per cabang; ``webgl`` memakai ``Scattergl`` tanpa label per titik."""
+    fig = go.Figure()
+    x = df_data['Label'].to_numpy()
+    values = df_data[col].to_numpy()
+    is_pct = col == 'CR IGD to IPT'
+    if is_pct:
+        txt = np.where(values > 0, np.char.mod('<b>%.1f%%</b>', values.astype(float)), '')
+    else:
+        txt = np.where(values > 0, np.char.add(np.char.add('<b>', fmt_values(values, False)), '</b>'), '')
+    for cb, pos in partition(df_data, branches):
+        if webgl:
+            trace = go.Scattergl(x=x[pos], y=values[pos], name=cb, mode='lines+markers', line=dict(color=color(cb)['dark'], width=2))
+        else:
+            trace = go.Scatter(x=x[pos], y=values[pos], name=cb, mode='lines+markers+text', text=txt[pos], textposition="top center", line=dict(color=color(cb)['dark'], width=3))
+        fig.add_trace(trace)
+    if is_pct:
+        fig.update_layout(height=400, yaxis_title="Persentase (%)", yaxis=dict(range=[0, 115]), legend=LEGEND)
+    else:
+        fig.update_layout(height=400, yaxis_title="Jumlah Pasien", legend=LEGEND)
+    return fig
+
+
+def ordered(df_data, branches):
+    """Posisi baris terurut per periode lalu cabang, untuk sumbu-x multikategori."""
+    rank = {cb: i for i, cb in enumerate(branches)}
+    branch = df_data['Cabang'].astype(object).map(rank).to_numpy(dtype=float)
+    pos = np.lexsort((branch, df_data['Periode'].to_numpy()))
+    return pos[~np.isnan(branch[pos])]
+
+
+def multicategory(df_data, pos):
+    return [df_data['Label'].to_numpy()[pos], df_data['Cabang'].astype(object).to_numpy()[pos]]
+
+
+def build_stacked_compact(df_data, branches, col_top, col_bottom, col_total, col_growth_name, y_label, is_revenue=False, target_col=None):
+    """Mode skala besar: satu trace per lapisan stack di sumbu-x (periode, cabang).
+
+    Label HTML per batang diganti teks growth pendek dan data hover numerik, sehingga
+    ukuran figure hanya bergantung pada jumlah batang, bukan jumlah cabang x trace.
+    """
+    fig = go.Figure()
+    pos = ordered(df_data, branches)
+    x = multicategory(df_data, pos)
+    cb = df_data['Cabang'].astype(object).to_numpy()[pos]
+    top, bottom, total = (df_data[c].to_numpy()[pos] for c in (col_top, col_bottom, col_total))
+    growth = df_data[col_growth_name].to_numpy(dtype=float)[pos]
+    growth_txt = np.char.mod('%+.1f%%', growth)
+    known = ~np.isnan(growth)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ach = np.nan_to_num(total / df_data[target_col].to_numpy()[pos] * 100, nan=0.0) if target_col else np.zeros(len(pos))
+    scale = 1e9 if is_revenue else 1
+    customdata = np.column_stack([total / scale, ach])
+    h_template = "<b>%{x}</b><br>Total: " + ("Rp %{customdata[0]:.2f} M" if is_revenue else "%{customdata[0]:,.0f} Pasien")
+    if target_col:
+        h_template += "<br>Ach: %{customdata[1]:.1f}%"
+    h_template += "<br>Growth: %{hovertext}<extra>%{fullData.name}</extra>"
+    # Growth NaN (tanpa data bulan lalu): label kosong, hover "–".
+    hovertext = np.where(known, growth_txt, '–')
+    light = [color(c)['light'] for c in cb]
+    dark = [color(c)['dark'] for c in cb]
+
+    fig.add_trace(go.Bar(x=x, y=bottom, name="Opt" if is_revenue else "Non JKN", marker_color=light, customdata=customdata, hovertext=hovertext, hovertemplate=h_template))
+    fig.add_trace(go.Bar(x=x, y=top, name="Ipt" if is_revenue else "JKN", marker_color=dark, customdata=customdata, hovertext=hovertext, hovertemplate=h_template,
+                         text=np.where(known, growth_txt, ''), textposition='outside', cliponaxis=False))
+    max_v = total.max() if len(total) else 0
+    y_limit = max_v * 1.15 if max_v > 0 else 100
+    fig.update_layout(barmode='stack', height=520, margin=dict(t=60, b=10), legend=LEGEND,
+                      yaxis=dict(title=y_label, range=[0, y_limit]))
+    if is_revenue:
+        revenue_ticks(fig, y_limit)
+    return fig
+
+
+def build_capacity_compact(df_data, branches):
+    """Mode skala besar: kapasitas (bar) dan volume rajal (marker) masing-masing satu trace."""
+    fig = go.Figure()
+    pos = ordered(df_data, branches)
+    x = multicategory(df_data, pos)
+    cb = df_data['Cabang'].astype(object).to_numpy()[pos]
+    cap, opt = df_data['Kapasitas Maks'].to_numpy()[pos], df_data['Total OPT'].to_numpy()[pos]
+    util = df_data['Utilisasi Poli'].to_numpy(dtype=float)[pos]
+    fig.add_trace(go.Bar(x=x, y=cap, name="Kapasitas Maks.", marker_color=[color(c)['light'] for c in cb], customdata=util,
+                         texttemplate="%{customdata:.0f}%", textposition='outside', cliponaxis=False,
+                         hovertemplate="<b>%{x}</b><br>Kapasitas Maks: %{y:,.0f}<br>Utilisasi: %{customdata:.1f}%<extra></extra>"))
+    fig.add_trace(go.Scatter(x=x, y=opt, name="Volume Rajal", mode='markers', marker=dict(color=[color(c)['dark'] for c in cb], size=9, symbol='diamond'),
+                             hovertemplate="<b>%{x}</b><br>Volume Rajal: %{y:,.0f}<extra></extra>"))
+    y_max = cap.max() if len(cap) else 100
+    fig.update_layout(height=520, margin=dict(t=60, b=10), yaxis=dict(title="Jumlah Pasien", range=[0, y_max * 1.15]), legend=LEGEND)
+    return fig
+
+
+def build_heatmap(df_data, branches, col, colorscale='Blues', suffix=''):
+    """Heatmap cabang x periode; satu trace berapa pun jumlah cabangnya."""
+    labels = df_data['Label']
+    periods_ = list(labels.cat.categories) if isinstance(labels.dtype, pd.CategoricalDtype) else list(pd.unique(labels))
+    present = set(labels.astype(object))
+    periods_ = [p for p in periods_ if p in present]
+    grid = np.full((len(branches), len(periods_)), np.nan)
+    row = {cb: i for i, cb in enumerate(branches)}
+    colix = {p: i for i, p in enumerate(periods_)}
+    r = df_data['Cabang'].astype(object).map(row).to_numpy(dtype=float)
+    c = labels.astype(object).map(colix).to_numpy(dtype=float)
+    ok = ~np.isnan(r)
+    grid[r[ok].astype(int), c[ok].astype(int)] = df_data[col].to_numpy(dtype=float)[ok]
+    fig = go.Figure(go.Heatmap(
+        z=grid, x=periods_, y=list(branches), colorscale=colorscale, colorbar=dict(title=suffix or None),
+        texttemplate=f"%{{z:.1f}}{suffix}" if grid.size <= HEATMAP_TEXT_CELLS else None,
+        hovertemplate=f"<b>%{{y}}</b><br>%{{x}}: %{{z:.1f}}{suffix}<extra></extra>",
+    ))
+    fig.update_layout(height=max(300, 24 * len(branches) + 140), margin=dict(t=30, b=10), yaxis=dict(autorange='reversed'))
+    return fig
+
+
+class FigureCache:
+    """Cache LRU figure Plotly, dipakai bersama seluruh sesi.
+
+    Kunci berisi id grafik, cabang & bulan terpilih, serta versi data, sehingga
+    tampilan yang sama (mis. default "semua cabang, semua bulan") cukup dibangun
+    sekali per versi data.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            fig = self._items.get(key)
+            if fig is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                instrument.count('figure_cache.hit')
+                return fig
+            self.misses += 1
+        instrument.count('figure_cache.miss')
+        with instrument.span('figure.build', chart=str(key[0])) as sp:
+            fig = build()
+            sp.set(traces=len(fig.data))
+        with self._lock:
+            self._items[key] = fig
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return fig
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._items), 'maxsize': self.maxsize}
@@ -0,0 +1,275 @@
+"""Ekspor laporan batch: workbook Excel dan HTML Plotly per cabang dan grup.
+
+    python -m export --out exports --period 2025-06
+    python -m export --csv app_data.csv --branches Cikampek Ciputat --workers 4
+
+Setiap laporan (satu cabang atau grup, satu periode) dirender di proses
+terpisah lewat ``ProcessPoolExecutor`` dengan metrik yang sama seperti
+dashboard. Di dashboard, ``Exporter`` menjalankan ekspor di thread latar
+sehingga UI tidak terblokir.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from helsa import instrument, metrics, periods
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = Path(os.environ.get('HELSA_EXPORT_DIR', Path(__file__).resolve().parent / 'exports'))
+GROUP_NAME = 'Grup'
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+REPORT_COLS = [
+    'Cabang', 'Tahun', 'Bulan', 'Target Revenue', 'Actual Revenue (Total)', 'Actual Revenue (Opt)', 'Actual Revenue (Ipt)',
+    'Pencapaian (%)', 'Total OPT', 'Total IPT', 'Total IGD', 'Total IGD to IPT', 'CR IGD to IPT',
+    'Pintu Poli', 'Kapasitas Maks', 'Utilisasi Poli',
+] + [f'{col}_Growth' for col in metrics.GROWTH_COLS]
+PERCENT_COLS = {'Pencapaian (%)', 'CR IGD to IPT', 'Utilisasi Poli'} | {f'{col}_Growth' for col in metrics.GROWTH_COLS}
+
+
+@dataclass(frozen=True)
+class Report:
+    """Satu unit kerja: ``frame`` adalah baris entitas (cabang atau agregat grup),
+    ``detail`` baris per cabang yang dipakai untuk grafik dan lembar "Per Cabang"."""
+    name: str
+    period: int
+    frame: pd.DataFrame
+    detail: pd.DataFrame
+
+
+def slug(name):
+    return re.sub(r'[^0-9A-Za-z]+', '-', str(name)).strip('-').lower() or 'laporan'
+
+
+def parse_period(text):
+    """``"2025-06"`` -> nomor ``periods.period``."""
+    year, month = text.split('-')
+    return periods.period(year, month)
+
+
+def report_table(df):
+    """Kolom laporan dari frame hasil ``enrich``/``group_frame``, termasuk pencapaian target."""
+    target = df['Target Revenue'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ach = np.where(target > 0, df['Actual Revenue (Total)'].to_numpy(dtype=float) / target * 100, np.nan)
+    table = df.assign(**{'Pencapaian (%)': ach})[REPORT_COLS].reset_index(drop=True)
+    table = table.rename(columns={f'{col}_Growth': f'Growth {col} (%)' for col in metrics.GROWTH_COLS})
+    return table.replace([np.inf, -np.inf], np.nan)
+
+
+def summary_table(frame, p):
+    """Ringkasan satu periode: bulan ini vs. bulan lalu, QTD, YTD per metrik."""
+    index = periods.PeriodIndex(frame)
+    rows = {}
+    for key, col in periods.PERIOD_METRICS.items():
+        cur, prev = index.total(key, p, p).sum(), index.total(key, p - 1, p - 1).sum()
+        rows[col] = {
+            'Bulan Ini': cur, 'Bulan Lalu': prev, 'Growth (%)': (cur / prev - 1) * 100 if prev else np.nan,
+            'QTD': index.qtd(key, p).sum(), 'YTD': index.ytd(key, p).sum(),
+        }
+
+    def ach(start, end):
+        target = index.total('target', start, end).sum()
+        return index.total('revenue', start, end).sum() / target * 100 if target else np.nan
+
+    rows['Pencapaian (%)'] = {'Bulan Ini': ach(p, p), 'Bulan Lalu': ach(p - 1, p - 1), 'Growth (%)': np.nan,
+                              'QTD': ach(p - p % 3, p), 'YTD': ach(p - p % 12, p)}
+    return pd.DataFrame.from_dict(rows, orient='index').rename_axis('Metrik').reset_index()
+
+
+def _format_sheet(ws, columns):
+    ws.freeze_panes = 'B2'
+    for i, col in enumerate(columns, start=1):
+        letter = ws.cell(row=1, column=i).column_letter
+        ws.column_dimensions[letter].width = min(max(len(str(col)) + 2, 12), 32)
+        fmt = '0.0' if col in PERCENT_COLS or '%' in str(col) else '#,##0'
+        for cell in ws[letter][1:]:
+            if isinstance(cell.value, (int, float)):
+                cell.number_format = fmt
+
+
+def write_workbook(report, path):
+    frame = report.frame[report.frame['Periode'] <= report.period]
+    sheets = {'Ringkasan': summary_table(frame, report.period), 'Bulanan': report_table(frame)}
+    if report.name == GROUP_NAME:
+        sheets['Per Cabang'] = report_table(report.detail[report.detail['Periode'] == report.period])
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for name, table in sheets.items():
+            table.to_excel(writer, sheet_name=name, index=False)
+            _format_sheet(writer.sheets[name], table.columns)
+
+
+def write_html(report, path, plotlyjs='inline'):
+    import charts
+
+    detail = report.detail[report.detail['Periode'] <= report.period]
+    branches = list(pd.unique(detail['Cabang'].astype(object)))
+    figures = [charts.build_stacked_figure(detail, branches, **spec) for spec in charts.STACKED_CHARTS.values()]
+    figures += [charts.build_capacity_figure(detail, branches), charts.build_cr_figure(detail, branches)]
+    include = True if plotlyjs == 'inline' else 'cdn'
+    body = '\n'.join(fig.to_html(full_html=False, include_plotlyjs=include if i == 0 else False) for i, fig in enumerate(figures))
+    title = f"Laporan {report.name} — {periods.label(report.period)}"
+    path.write_text(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title></head>'
+                    f'<body><h1>{title}</h1>\n{body}\n</body></html>\n', encoding='utf-8')
+
+
+def render(report, out_dir, plotlyjs='inline'):
+    """Tulis workbook dan HTML satu laporan; dijalankan di proses worker."""
+    out_dir = Path(out_dir)
+    stem = f"{slug(report.name)}_{report.period // 12}-{report.period % 12 + 1:02d}"
+    xlsx, html = out_dir / f'{stem}.xlsx', out_dir / f'{stem}.html'
+    write_workbook(report, xlsx)
+    write_html(report, html, plotlyjs)
+    return [str(xlsx), str(html)]
+
+
+def build_reports(df, period=None, branches=None):
+    """Satu ``Report`` per cabang terpilih ditambah satu untuk grup."""
+    df = metrics.select(df, branches)
+    if period is None:
+        period = int(df['Periode'].max())
+    reports = [Report(GROUP_NAME, period, metrics.group_frame(df, GROUP_NAME), df)]
+    for cb, pos in df.groupby('Cabang', sort=False, observed=True).indices.items():
+        rows = df.iloc[pos]
+        reports.append(Report(str(cb), period, rows, rows))
+    return reports
+
+
+def export_reports(df, out_dir=EXPORT_DIR, period=None, branches=None, max_workers=MAX_WORKERS, plotlyjs='inline', progress=None):
+    """Render semua laporan secara paralel di process pool.
+
+    ``progress(done, total, name)`` dipanggil di proses induk setiap kali satu
+    laporan selesai. Laporan yang gagal dicatat dan tidak menghentikan yang lain;
+    mengembalikan ``(files, errors)``.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    reports = build_reports(df, period, branches)
+    files, errors = [], []
+    with instrument.span('export', rows=len(df)) as sp:
+        # spawn: aman dipanggil dari proses ber-thread (server Streamlit).
+        with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(reports))),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {pool.submit(render, r, out_dir, plotlyjs): r.name for r in reports}
+            for done, future in enumerate(as_completed(futures), start=1):
+                name = futures[future]
+                try:
+                    files += future.result()
+                except Exception as e:
+                    logger.warning("Laporan %s gagal dibuat: %s", name, e)
+                    errors.append((name, str(e)))
+                if progress is not None:
+                    progress(done, len(reports), name)
+        sp.set(bytes=sum(os.path.getsize(f) for f in files))
+    instrument.count('export.report', len(files) // 2)
+    return files, errors
+
+
+def list_exports(out_dir=EXPORT_DIR):
+    """Berkas hasil ekspor, terbaru lebih dulu: ``[(path, bytes, mtime), ...]``."""
+    out_dir = Path(out_dir)
+    if not out_dir.exists():
+        return []
+    entries = [(p, p.stat().st_size, p.stat().st_mtime) for p in out_dir.iterdir() if p.suffix in ('.xlsx', '.html')]
+    return sorted(entries, key=lambda e: (-e[2], e[0].name))
+
+
+class Exporter:
+    """Menjalankan ``export_reports`` di thread latar; hanya satu ekspor sekaligus."""
+
+    def __init__(self, out_dir=EXPORT_DIR, max_workers=MAX_WORKERS):
+        self.out_dir = Path(out_dir)
+        self.max_workers = max_workers
+        self.done = 0
+        self.total = 0
+        self.last = None
+        self.errors = []
+        self.error = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, df, period=None, branches=None):
+        """Mulai ekspor; ``False`` bila ekspor lain masih berjalan."""
+        with self._lock:
+            if self.running:
+                return False
+            self.done, self.total, self.last, self.errors, self.error = 0, 0, None, [], None
+            self._thread = threading.Thread(target=self._run, args=(df, period, branches), name='helsa-export', daemon=True)
+            self._thread.start()
+            return True
+
+    def _progress(self, done, total, name):
+        self.done, self.total, self.last = done, total, name
+
+    def _run(self, df, period, branches):
+        try:
+            _, self.errors = export_reports(df, self.out_dir, period, branches, self.max_workers, progress=self._progress)
+        except Exception as e:
+            logger.warning("Ekspor gagal: %s", e)
+            self.error = e
+        self.finished_at = time.time()
+
+    def status(self):
+        return {'running': self.running, 'done': self.done, 'total': self.total, 'last': self.last,
+                'errors': list(self.errors), 'error': self.error, 'finished_at': self.finished_at}
+
+    def listing(self):
+        return list_exports(self.out_dir)
+
+
+def load_frame(args):
+    from helsa.loader import PARSER_VERSION, parse_csv
+    from helsa.sources import load_all, parse_spec
+
+    if args.csv:
+        return metrics.enrich(parse_csv(Path(args.csv).read_bytes()))
+    spec = args.sources or os.environ.get('HELSA_SOURCES') or os.environ.get('HELSA_SHEET_URL')
+    if not spec:
+        raise SystemExit("Tentukan --csv, --sources, atau HELSA_SOURCES/HELSA_SHEET_URL.")
+    return metrics.enrich(load_all(parse_spec(spec), parse_csv, version=PARSER_VERSION).frame)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', help="CSV lokal (format sheet app_data)")
+    parser.add_argument('--sources', help="daftar sumber 'url|tahun|wilayah; ...' (default: HELSA_SOURCES/HELSA_SHEET_URL)")
+    parser.add_argument('--out', default=str(EXPORT_DIR))
+    parser.add_argument('--period', help="periode laporan YYYY-MM (default: periode terakhir)")
+    parser.add_argument('--branches', nargs='+', help="cabang yang diekspor (default: semua)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--plotlyjs', choices=['inline', 'cdn'], default='inline', help="sematkan plotly.js atau muat dari CDN")
+    args = parser.parse_args(argv)
+
+    df = load_frame(args)
+    period = parse_period(args.period) if args.period else None
+
+    def progress(done, total, name):
+        print(f"[{done}/{total}] {name}", file=sys.stderr)
+
+    files, errors = export_reports(df, args.out, period, args.branches, args.workers, args.plotlyjs, progress)
+    for f in files:
+        print(f)
+    for name, error in errors:
+        print(f"GAGAL {name}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Mesin metrik headless dashboard Helsa-BR.
+
+Tidak bergantung pada Streamlit maupun Plotly, sehingga bisa dipakai dashboard,
+job batch, dan benchmark. Nama publik dimuat secara lazy: ``import helsa``
+tidak mengimpor pandas/pyarrow sampai salah satu fungsinya dipakai.
+
+    >>> import helsa
+    >>> df = helsa.enrich(helsa.parse_csv(raw))
+    >>> helsa.group_summary(helsa.select(df, months=['Januari']), 'Total OPT')
+"""
+import importlib
+
+_EXPORTS = {
+    'MONTH_MAP': 'helsa.months',
+    'SCHEMA': 'helsa.schema',
+    'NUMERIC_COLS': 'helsa.schema',
+    'Column': 'helsa.schema',
+    'parse_number': 'helsa.schema',
+    'parse_csv': 'helsa.loader',
+    'PARSER_VERSION': 'helsa.loader',
+    'working_day_table': 'helsa.capacity',
+    'utilisation': 'helsa.capacity',
+    'enrich': 'helsa.metrics',
+    'growth': 'helsa.metrics',
+    'select': 'helsa.metrics',
+    'group_summary': 'helsa.metrics',
+    'group_frame': 'helsa.metrics',
+    'top_branches': 'helsa.metrics',
+    'GroupSummary': 'helsa.metrics',
+    'PeriodIndex': 'helsa.periods',
+    'period': 'helsa.periods',
+    'Snapshot': 'helsa.snapshot',
+    'SnapshotStore': 'helsa.snapshot',
+    'DataProvider': 'helsa.provider',
+    'Source': 'helsa.sources',
+    'load_all': 'helsa.sources',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'helsa' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
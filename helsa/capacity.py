@@ -0,0 +1,49 @@
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from helsa.months import MONTH_MAP
+
+DEFAULT_YEAR = 2025
+
+# Slot layanan per pintu poli: Senin-Jumat 12 jam, Sabtu 4 jam, 5 pasien per jam.
+WEEKDAY_SLOTS = 12 * 5
+SATURDAY_SLOTS = 4 * 5
+
+# Daftar libur nasional (ISO, dipisah koma), mis. HELSA_HOLIDAYS=2025-01-01,2025-03-31
+NATIONAL_HOLIDAYS = tuple(d.strip() for d in os.environ.get('HELSA_HOLIDAYS', '').split(',') if d.strip())
+
+
+@functools.lru_cache(maxsize=32)
+def _working_days(years, holidays):
+    years = np.asarray(years, dtype=np.int64)
+    months = ((years[:, None] - 1970) * 12 + np.arange(12)).ravel().astype('datetime64[M]')
+    start, end = months.astype('datetime64[D]'), (months + 1).astype('datetime64[D]')
+    hol = np.asarray(holidays, dtype='datetime64[D]')
+    table = pd.DataFrame({
+        'Tahun': np.repeat(years, 12),
+        'Bulan_No': np.tile(np.arange(1, 13), len(years)),
+        'Hari Kerja': np.busday_count(start, end, weekmask='1111100', holidays=hol),
+        'Hari Sabtu': np.busday_count(start, end, weekmask='0000010', holidays=hol),
+    })
+    return table.set_index(['Tahun', 'Bulan_No'])
+
+
+def working_day_table(years, holidays=NATIONAL_HOLIDAYS):
+    """Tabel jumlah hari Senin-Jumat dan Sabtu per (Tahun, Bulan_No)."""
+    return _working_days(tuple(sorted({int(y) for y in years})), tuple(sorted(holidays)))
+
+
+def capacity(df, holidays=NATIONAL_HOLIDAYS):
+    """Kapasitas maksimum rawat jalan per baris, dihitung tanpa loop per baris."""
+    years = df['Tahun'].to_numpy() if 'Tahun' in df.columns else np.full(len(df), DEFAULT_YEAR)
+    months = df['Bulan'].astype(object).map(MONTH_MAP).fillna(1).astype(int).to_numpy()
+    days = working_day_table(np.unique(years), holidays).reindex(pd.MultiIndex.from_arrays([years, months]))
+    slots = days['Hari Kerja'].to_numpy() * WEEKDAY_SLOTS + days['Hari Sabtu'].to_numpy() * SATURDAY_SLOTS
+    return pd.Series(df['Pintu Poli'].to_numpy() * slots, index=df.index)
+
+
+def utilisation(volume, cap):
+    return np.where(cap > 0, volume / np.where(cap > 0, cap, 1) * 100, 0)
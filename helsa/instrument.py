@@ -0,0 +1,166 @@
+"""Instrumentasi hot path: durasi per tahap, jumlah baris, ukuran payload, hit/miss cache.
+
+Nonaktif secara default (``HELSA_METRICS=1`` atau ``enable()`` untuk menyalakan).
+Saat nonaktif ``span()`` mengembalikan objek no-op bersama dan ``count()`` langsung
+kembali, sehingga biaya di hot path hanya satu pengecekan boolean.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('helsa.metrics')
+
+MAX_RECORDS = 1000
+
+_enabled = os.environ.get('HELSA_METRICS', '') not in ('', '0')
+_lock = threading.Lock()
+_records = deque(maxlen=MAX_RECORDS)
+_counters = defaultdict(int)
+_stages = defaultdict(lambda: {'count': 0, 'seconds': 0.0, 'max_s': 0.0, 'rows': 0, 'bytes': 0})
+
+
+def enabled():
+    return _enabled
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('stage', 'fields', 'start')
+
+    def __init__(self, stage, fields):
+        self.stage = stage
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        record = {'ts': time.time(), 'stage': self.stage, 'seconds': seconds, **self.fields}
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        with _lock:
+            _records.append(record)
+            agg = _stages[self.stage]
+            agg['count'] += 1
+            agg['seconds'] += seconds
+            agg['max_s'] = max(agg['max_s'], seconds)
+            agg['rows'] += self.fields.get('rows', 0)
+            agg['bytes'] += self.fields.get('bytes', 0)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record, default=str))
+        return False
+
+
+def span(stage, **fields):
+    """Context manager pengukur satu tahap; ``rows``/``bytes`` bisa diisi lewat ``set()``."""
+    if not _enabled:
+        return _NOOP
+    return _Span(stage, fields)
+
+
+def count(name, n=1):
+    if _enabled:
+        with _lock:
+            _counters[name] += n
+
+
+def records():
+    with _lock:
+        return list(_records)
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def stages():
+    """Ringkasan per tahap: count, total & rata-rata detik, max, baris dan bytes."""
+    with _lock:
+        return {name: {**agg, 'avg_s': agg['seconds'] / agg['count']} for name, agg in _stages.items()}
+
+
+def reset():
+    with _lock:
+        _records.clear()
+        _counters.clear()
+        _stages.clear()
+
+
+def export_jsonl():
+    return '\n'.join(json.dumps(r, default=str) for r in records())
+
+
+def _metric_name(name):
+    return ''.join(ch if ch.isalnum() else '_' for ch in name)
+
+
+def export_prometheus():
+    """Format teks eksposisi Prometheus."""
+    lines = [
+        '# TYPE helsa_stage_seconds_total counter',
+        '# TYPE helsa_stage_calls_total counter',
+        '# TYPE helsa_stage_rows_total counter',
+        '# TYPE helsa_stage_bytes_total counter',
+    ]
+    for name, agg in sorted(stages().items()):
+        label = f'{{stage="{name}"}}'
+        lines += [
+            f'helsa_stage_seconds_total{label} {agg["seconds"]:.6f}',
+            f'helsa_stage_calls_total{label} {agg["count"]}',
+            f'helsa_stage_rows_total{label} {agg["rows"]}',
+            f'helsa_stage_bytes_total{label} {agg["bytes"]}',
+        ]
+    for name, value in sorted(counters().items()):
+        lines.append(f'helsa_{_metric_name(name)}_total {value}')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        body = export_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, host='0.0.0.0'):
+    """Jalankan endpoint ``/metrics`` (Prometheus) di thread latar."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='helsa-metrics', daemon=True).start()
+    return server
@@ -0,0 +1,71 @@
+import csv
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from helsa.months import MONTH_MAP
+from helsa.schema import NUMERIC_KINDS, SCHEMA, convert
+
+# Naikkan bila hasil parse berubah agar snapshot lama di disk tidak dipakai ulang.
+PARSER_VERSION = 2
+
+
+def _header(raw):
+    first = raw.split(b'\n', 1)[0].decode('utf-8-sig')
+    return next(csv.reader([first]), [])
+
+
+def parse_csv(raw, schema=SCHEMA):
+    """Parse CSV mentah (bytes) dari sheet menjadi frame bertipe sesuai ``schema``.
+
+    Seluruh kolom skema dibaca sebagai string oleh pembaca CSV Arrow dalam satu
+    lintasan, lalu dikonversi per kolom dengan kernel Arrow (tanpa regex per sel
+    di Python). ``ValueError`` bila kolom kunci wajib (cabang/bulan) tidak ada,
+    mis. halaman login HTML untuk tab yang tidak publik atau header yang berbeda.
+    """
+    names = {name.strip(): name for name in _header(raw)}
+    missing = [c.name for c in schema if c.required and c.kind in ('category', 'month') and c.name not in names]
+    if missing:
+        hint = " (sumber mengembalikan HTML, bukan CSV)" if raw.lstrip()[:1] == b'<' else ""
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}{hint}")
+    table = pacsv.read_csv(
+        pa.py_buffer(raw),
+        convert_options=pacsv.ConvertOptions(
+            column_types={names[c.name]: pa.string() for c in schema if c.name in names},
+            strings_can_be_null=True,
+        ),
+    )
+    table = table.rename_columns([c.strip() for c in table.column_names])
+
+    columns = {}
+    for col in schema:
+        if col.name not in table.column_names:
+            if col.required and col.kind in NUMERIC_KINDS:
+                columns[col.name] = pa.nulls(table.num_rows, pa.string())
+            else:
+                continue
+        else:
+            columns[col.name] = table[col.name]
+        if col.kind in NUMERIC_KINDS:
+            columns[col.name] = convert(columns[col.name], col.kind)
+        else:
+            columns[col.name] = pc.utf8_trim_whitespace(pc.cast(columns[col.name], pa.string()))
+    for name in table.column_names:
+        if name not in columns:
+            columns[name] = table[name]
+
+    return apply_categories(pa.table(columns).to_pandas(), schema)
+
+
+def apply_categories(df, schema=SCHEMA):
+    """Terapkan dtype kategori skema (Cabang: urutan kemunculan, Bulan: urutan kalender)."""
+    for col in schema:
+        if col.name not in df.columns:
+            continue
+        if col.kind == 'category':
+            df[col.name] = pd.Categorical(df[col.name], categories=pd.unique(df[col.name].dropna()))
+        elif col.kind == 'month':
+            df[col.name] = pd.Categorical(df[col.name], categories=list(MONTH_MAP), ordered=True)
+    return df
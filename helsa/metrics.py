@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from helsa import capacity, instrument
+from helsa.months import MONTH_MAP
+
+TOTAL_COLS = {
+    'Total OPT': ('Volume OPT JKN', 'Volume OPT Non JKN'),
+    'Total IPT': ('Volume IPT JKN', 'Volume IPT Non JKN'),
+    'Total IGD': ('Volume IGD JKN', 'Volume IGD Non JKN'),
+    'Total IGD to IPT': ('Volume IGD to IPT JKN', 'Volume IGD to IPT Non JKN'),
+}
+GROWTH_COLS = ['Actual Revenue (Total)', 'Total OPT', 'Total IPT', 'Total IGD', 'Total IGD to IPT']
+RATIO_COLS = ['CR IGD to IPT', 'Utilisasi Poli'] + [f'{col}_Growth' for col in GROWTH_COLS]
+INDEX_NAMES = ['cabang', 'tahun', 'bulan_no']
+OTHERS = 'Lainnya'
+
+
+def as_frame(data):
+    """Terima ``pandas.DataFrame`` atau tabel Arrow (apa pun yang punya ``to_pandas``)."""
+    if isinstance(data, pd.DataFrame):
+        return data
+    return data.to_pandas()
+
+
+def growth(df, col):
+    """Pertumbuhan (%) terhadap bulan kalender sebelumnya pada cabang yang sama.
+
+    Bulan sebelumnya dicari lewat nomor periode, bukan baris sebelumnya, sehingga
+    hasilnya tetap benar untuk pilihan bulan yang tidak berurutan.
+    """
+    cur = pd.Series(df[col].to_numpy(dtype=float), index=pd.MultiIndex.from_arrays([df['Cabang'], df['Periode']]))
+    cur = cur[~cur.index.duplicated(keep='last')]
+    prev = cur.reindex(pd.MultiIndex.from_arrays([df['Cabang'], df['Periode'] - 1])).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (df[col].to_numpy(dtype=float) / prev - 1) * 100
+
+
+def enrich(df, holidays=capacity.NATIONAL_HOLIDAYS, compact=True):
+    """Turunkan seluruh metrik dashboard dari frame hasil ``parse_csv``.
+
+    Hasilnya terurut dan ber-index (cabang, tahun, bulan_no); filter sidebar
+    cukup mengiris frame ini tanpa menghitung ulang. Dengan ``compact`` kolom
+    bilangan bulat di-downcast dan rasio disimpan sebagai float32, karena frame
+    ini dipakai bersama (read-only) oleh semua sesi.
+    """
+    with instrument.span('enrich', rows=len(df)):
+        out = _enrich(as_frame(df), holidays)
+        return compact_dtypes(out) if compact else out
+
+
+def _enrich(df, holidays):
+    out = df.copy()
+    if 'Tahun' not in out.columns:
+        out['Tahun'] = capacity.DEFAULT_YEAR
+    out['Tahun'] = out['Tahun'].fillna(capacity.DEFAULT_YEAR).astype(int)
+    out['Bulan_No'] = out['Bulan'].astype(object).map(MONTH_MAP)
+    out = out.dropna(subset=['Bulan_No'])
+    out['Bulan_No'] = out['Bulan_No'].astype(int)
+    out['Periode'] = out['Tahun'] * 12 + out['Bulan_No'] - 1
+    # Label sumbu-x: nama bulan saja, atau "Bulan Tahun" bila data mencakup beberapa tahun.
+    if out['Tahun'].nunique() > 1:
+        labels = out['Bulan'].astype(str) + ' ' + out['Tahun'].astype(str)
+    else:
+        labels = out['Bulan'].astype(str)
+    out['Label'] = pd.Categorical(labels, categories=pd.unique(labels.iloc[np.argsort(out['Periode'].to_numpy(), kind='stable')]))
+    # Urutan cabang mengikuti urutan kemunculan di sheet.
+    branch_rank = {cb: i for i, cb in enumerate(pd.unique(out['Cabang']))}
+    out = out.sort_values(['Cabang', 'Periode'], kind='stable', key=lambda s: s.astype(object).map(branch_rank) if s.name == 'Cabang' else s)
+
+    for col, (jkn, non_jkn) in TOTAL_COLS.items():
+        out[col] = out[jkn] + out[non_jkn]
+    with instrument.span('capacity', rows=len(out)):
+        out['Kapasitas Maks'] = capacity.capacity(out, holidays)
+    _ratios(out)
+
+    out.index = pd.MultiIndex.from_arrays([out['Cabang'], out['Tahun'], out['Bulan_No']], names=INDEX_NAMES)
+    return out
+
+
+def _ratios(out):
+    """CR, utilisasi, dan growth dari kolom total (in-place)."""
+    out['CR IGD to IPT'] = np.where(out['Total IGD'] > 0, (out['Total IGD to IPT'] / out['Total IGD'].where(out['Total IGD'] > 0, 1)) * 100, 0)
+    out['Utilisasi Poli'] = capacity.utilisation(out['Total OPT'], out['Kapasitas Maks'])
+    with instrument.span('growth', rows=len(out)):
+        for col in GROWTH_COLS:
+            out[f'{col}_Growth'] = growth(out, col)
+
+
+def group_frame(df, name='Grup'):
+    """Agregat seluruh cabang per periode sebagai satu "cabang" ``name``.
+
+    Volume, revenue, dan kapasitas dijumlahkan; rasio dan growth dihitung ulang
+    dari total grup, bukan dirata-rata dari rasio per cabang. Kolom non-numerik
+    lain (mis. ``Wilayah`` atau catatan) diisi nilainya bila seragam, selain itu kosong.
+    """
+    df = as_frame(df)
+    sum_cols = [c for c in df.columns if c not in RATIO_COLS and c not in ('Cabang', 'Bulan', 'Tahun', 'Bulan_No', 'Periode', 'Label')
+                and pd.api.types.is_numeric_dtype(df[c].dtype)]
+    out = df.groupby(['Tahun', 'Bulan_No', 'Periode'], sort=True, observed=True)[sum_cols].sum().reset_index()
+    labels = df.drop_duplicates('Periode').set_index('Periode')['Label']
+    out.insert(0, 'Cabang', pd.Categorical([name] * len(out)))
+    out.insert(1, 'Bulan', pd.Categorical(np.asarray(list(MONTH_MAP))[out['Bulan_No'].to_numpy() - 1], categories=list(MONTH_MAP)))
+    out['Label'] = pd.Categorical(labels.reindex(out['Periode']).to_numpy(), categories=df['Label'].cat.categories
+                                  if isinstance(df['Label'].dtype, pd.CategoricalDtype) else None)
+    _ratios(out)
+    for col in df.columns.difference(out.columns, sort=False):
+        values = pd.unique(df[col].dropna())
+        out[col] = values[0] if len(values) == 1 else None
+    out.index = pd.MultiIndex.from_arrays([out['Cabang'], out['Tahun'], out['Bulan_No']], names=INDEX_NAMES)
+    return out
+
+
+def top_branches(df, n, col='Actual Revenue (Total)', others=OTHERS):
+    """Pertahankan ``n`` cabang dengan total ``col`` terbesar; sisanya digabung per periode
+    menjadi satu cabang ``others`` (lewat ``group_frame``).
+
+    Mengembalikan ``(frame, branches)``: ``branches`` adalah cabang yang benar-benar
+    ada di ``frame``, terurut dari total terbesar dengan ``others`` di akhir, atau
+    urutan kemunculan bila tidak ada yang perlu digabung.
+    """
+    df = as_frame(df)
+    totals = df.groupby('Cabang', sort=False, observed=True)[col].sum().sort_values(ascending=False, kind='stable')
+    if len(totals) <= n:
+        return df, list(pd.unique(df['Cabang'].astype(object)))
+    keep = list(totals.index[:n])
+    in_keep = df['Cabang'].isin(keep).to_numpy()
+    top = df[in_keep]
+    out = pd.concat([top, group_frame(df[~in_keep], others).reindex(columns=top.columns)])
+    out['Cabang'] = pd.Categorical(out['Cabang'].astype(object), categories=keep + [others])
+    return out, keep + [others]
+
+
+def compact_dtypes(df):
+    """Downcast kolom integer ke tipe terkecil dan rasio ke float32 (revenue tetap float64)."""
+    slim = {}
+    for col in df.columns:
+        if col in RATIO_COLS:
+            slim[col] = df[col].astype(np.float32)
+        elif pd.api.types.is_integer_dtype(df[col].dtype) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            slim[col] = pd.to_numeric(df[col], downcast='integer')
+    return df.assign(**slim)
+
+
+def memory_usage(df):
+    """Ukuran frame (bytes, termasuk index & string) untuk laporan memori."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(shared, view):
+    """Bytes frame bersama vs. tambahan per sesi (0 bila ``view`` adalah frame bersama itu sendiri)."""
+    return {'shared_bytes': memory_usage(shared), 'session_bytes': 0 if view is shared else memory_usage(view),
+            'rows': len(shared), 'session_rows': len(view)}
+
+
+def select(df, branches=None, months=None, years=None):
+    """Iris frame hasil ``enrich`` menurut cabang, nama bulan dan tahun (``None`` = semua).
+
+    Bila semua baris terpilih, frame bersama dikembalikan apa adanya (tanpa
+    salinan); pemanggil tidak boleh memodifikasinya.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if years is not None:
+        mask &= df['Tahun'].isin(years).to_numpy()
+    if branches is not None:
+        mask &= df['Cabang'].isin(branches).to_numpy()
+    if months is not None:
+        mask &= df['Bulan'].isin(months).to_numpy()
+    return df if mask.all() else df[mask]
+
+
+@dataclass(frozen=True)
+class GroupSummary:
+    by_branch: pd.DataFrame
+    group_avg: float
+    group_total: float
+
+
+def group_summary(df, col):
+    """Rata-rata & total per cabang, rata-rata bulanan grup, dan kontribusi.
+
+    Hanya baris dengan nilai > 0 yang dihitung; semua agregat diambil dari satu
+    faktorisasi cabang/periode.
+    """
+    df = as_frame(df)
+    values = df[col].to_numpy(dtype=float)
+    ok = values > 0
+    values = values[ok]
+    branch_codes, branches = pd.factorize(df['Cabang'].to_numpy()[ok])
+    period_col = 'Periode' if 'Periode' in df.columns else 'Bulan'
+    period_codes, _ = pd.factorize(df[period_col].to_numpy()[ok])
+    sums = np.bincount(branch_codes, weights=values, minlength=len(branches))
+    counts = np.bincount(branch_codes, minlength=len(branches))
+    monthly = np.bincount(period_codes, weights=values)
+    group_total = sums.sum()
+    by_branch = pd.DataFrame({
+        'avg': sums / np.maximum(counts, 1),
+        'total': sums,
+        'contribution': sums / group_total * 100 if group_total > 0 else np.zeros(len(sums)),
+    }, index=pd.Index(branches, name='Cabang'))
+    return GroupSummary(by_branch, monthly.mean() if len(monthly) else 0.0, group_total)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from helsa.months import MONTH_MAP
+
+MONTH_NAMES = list(MONTH_MAP)
+
+# Metrik yang diindeks: kunci pendek -> kolom frame hasil ``enrich``.
+PERIOD_METRICS = {
+    'revenue': 'Actual Revenue (Total)',
+    'target': 'Target Revenue',
+    'opt': 'Total OPT',
+    'ipt': 'Total IPT',
+    'igd': 'Total IGD',
+    'igd_to_ipt': 'Total IGD to IPT',
+}
+
+
+def period(year, month):
+    """Nomor periode kontinu (sama dengan kolom ``Periode``): tahun*12 + bulan-1."""
+    return int(year) * 12 + int(month) - 1
+
+
+def label(p):
+    return f"{MONTH_NAMES[p % 12]} {p // 12}"
+
+
+class PeriodIndex:
+    """Prefix-sum per cabang dan metrik di sepanjang sumbu (tahun, bulan).
+
+    Total, rata-rata, pencapaian target, dan perbandingan antar rentang periode
+    kontigu dijawab dengan dua lookup per cabang, tanpa memindai ulang frame.
+    Rentang ``start``/``end`` inklusif dan dinyatakan dengan nomor ``period()``.
+    """
+
+    def __init__(self, df, metrics=PERIOD_METRICS):
+        self.metrics = dict(metrics)
+        codes, branches = pd.factorize(np.asarray(df['Cabang'], dtype=object))
+        self.branches = list(branches)
+        periods = df['Periode'].to_numpy(dtype=np.int64)
+        self.first = int(periods.min()) if len(periods) else 0
+        self.last = int(periods.max()) if len(periods) else -1
+        offsets = periods - self.first
+        shape = (len(self.branches), self.last - self.first + 1)
+
+        self._cum = {}
+        for key, col in self.metrics.items():
+            grid = np.zeros(shape)
+            np.add.at(grid, (codes, offsets), df[col].to_numpy(dtype=float))
+            self._cum[key] = self._prefix(grid)
+        present = np.zeros(shape)
+        np.add.at(present, (codes, offsets), 1)
+        self._months = self._prefix(present > 0)
+
+    @staticmethod
+    def _prefix(grid):
+        return np.concatenate([np.zeros((grid.shape[0], 1)), np.cumsum(grid, axis=1)], axis=1)
+
+    def periods(self):
+        return list(range(self.first, self.last + 1))
+
+    def _bounds(self, start, end):
+        s = min(max(start, self.first), self.last + 1) - self.first
+        e = min(max(end, self.first - 1), self.last) - self.first + 1
+        return s, max(s, e)
+
+    def _range(self, cum, start, end):
+        s, e = self._bounds(start, end)
+        return pd.Series(cum[:, e] - cum[:, s], index=pd.Index(self.branches, name='Cabang'))
+
+    def total(self, metric, start, end):
+        """Total per cabang untuk rentang [start, end]."""
+        return self._range(self._cum[metric], start, end)
+
+    def months(self, start, end):
+        """Jumlah bulan berisi data per cabang dalam rentang."""
+        return self._range(self._months, start, end)
+
+    def average(self, metric, start, end):
+        months = self.months(start, end)
+        return self.total(metric, start, end) / months.where(months > 0)
+
+    def achievement(self, start, end):
+        target = self.total('target', start, end)
+        return self.total('revenue', start, end) / target.where(target > 0) * 100
+
+    def compare(self, metric, a, b):
+        """Bandingkan rentang ``a`` dengan ``b`` (masing-masing tuple (start, end))."""
+        total_a, total_b = self.total(metric, *a), self.total(metric, *b)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (total_a / total_b.where(total_b != 0) - 1) * 100
+        return pd.DataFrame({'A': total_a, 'B': total_b, 'Perubahan (%)': change})
+
+    def ytd(self, metric, p):
+        return self.total(metric, p - p % 12, p)
+
+    def qtd(self, metric, p):
+        return self.total(metric, p - p % 3, p)
+
+    def rolling(self, metric, p, window=3):
+        return self.total(metric, p - window + 1, p)
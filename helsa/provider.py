@@ -0,0 +1,82 @@
+import logging
+import threading
+
+from helsa import snapshot, sources as source_mod
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 300
+
+
+class DataProvider:
+    """Penyedia data bersama untuk seluruh sesi (stale-while-revalidate).
+
+    Snapshot terbaru disimpan sebagai satu referensi yang diganti secara atomik;
+    sesi hanya membaca ``current()`` dan tidak pernah menunggu jaringan. Refresh
+    berjalan di thread latar dengan jaminan single-flight: bila sebuah fetch
+    masih berjalan, permintaan refresh berikutnya langsung diabaikan.
+
+    ``sources`` berisi ``Source`` (atau URL); semua sumber dimuat paralel dan
+    digabung menjadi satu snapshot.
+    """
+
+    def __init__(self, sources, parse, interval=REFRESH_SECONDS, store=None, version=None, max_workers=source_mod.MAX_WORKERS):
+        self.sources = [s if isinstance(s, source_mod.Source) else source_mod.Source(s) for s in sources]
+        self.parse = parse
+        self.max_workers = max_workers
+        self.version = version
+        self.interval = interval
+        self.store = store or snapshot.SnapshotStore()
+        self.last_error = None
+        self._current = None
+        self._flight = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        return self._current
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        # Sajikan snapshot disk dulu (tanpa jaringan), lalu revalidasi di latar.
+        cached = source_mod.read_cached(self.sources, self.store, self.version)
+        if cached is not None:
+            self._publish(cached)
+        self._thread = threading.Thread(target=self._run, name='helsa-refresh', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self):
+        """Jalankan satu refresh; ``False`` bila refresh lain sedang berjalan."""
+        if not self._flight.acquire(blocking=False):
+            return False
+        try:
+            snap = source_mod.load_all(self.sources, self.parse, store=self.store, version=self.version, max_workers=self.max_workers)
+            self.last_error = None
+            self._publish(snap)
+        except Exception as e:
+            self.last_error = e
+            logger.warning("Refresh gagal: %s", e)
+        finally:
+            self._flight.release()
+            self._ready.set()
+        return True
+
+    def _publish(self, snap):
+        old = self._current
+        if old is None or (old.digest, old.stale, old.errors) != (snap.digest, snap.stale, snap.errors):
+            self._current = snap
+        self._ready.set()
+
+    def _run(self):
+        self.refresh()
+        while not self._stop.wait(self.interval):
+            self.refresh()
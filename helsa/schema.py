@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Format angka yang dikenali (setelah simbol mata uang & spasi dibuang):
+#   1.234.567,89  -> titik ribuan, koma desimal (lokal Indonesia)
+#   1,234,567.89  -> koma ribuan, titik desimal (ekspor en-US)
+#   1234,5 / 1234.5 / 1234
+# Pemisah yang diikuti tepat 3 digit dianggap pemisah ribuan.
+_ID_GROUPED = r'^-?\d{1,3}(\.\d{3})+(,\d+)?$'
+_US_GROUPED = r'^-?\d{1,3}(,\d{3})+(\.\d+)?$'
+_COMMA_DECIMAL = r'^-?\d+,\d+$'
+_PLAIN = r'^-?\d+(\.\d+)?$'
+
+
+@dataclass(frozen=True)
+class Column:
+    """Deklarasi satu kolom sheet ``app_data``.
+
+    ``kind``: ``rupiah`` (float64), ``volume`` (int64), ``int``, ``category``
+    atau ``month`` (kategori berurutan Januari..Desember).
+    """
+    name: str
+    kind: str
+    required: bool = True
+
+
+SCHEMA = (
+    Column('Cabang', 'category'),
+    Column('Bulan', 'month'),
+    Column('Tahun', 'int', required=False),
+    Column('Target Revenue', 'rupiah'),
+    Column('Actual Revenue (Total)', 'rupiah'),
+    Column('Actual Revenue (Opt)', 'rupiah'),
+    Column('Actual Revenue (Ipt)', 'rupiah'),
+    Column('Volume OPT JKN', 'volume'),
+    Column('Volume OPT Non JKN', 'volume'),
+    Column('Volume IPT JKN', 'volume'),
+    Column('Volume IPT Non JKN', 'volume'),
+    Column('Volume IGD JKN', 'volume'),
+    Column('Volume IGD Non JKN', 'volume'),
+    Column('Volume IGD to IPT JKN', 'volume'),
+    Column('Volume IGD to IPT Non JKN', 'volume'),
+    Column('Pintu Poli', 'volume'),
+)
+
+NUMERIC_KINDS = ('rupiah', 'volume', 'int')
+NUMERIC_COLS = [c.name for c in SCHEMA if c.kind in ('rupiah', 'volume')]
+ARROW_TYPES = {'rupiah': pa.float64(), 'volume': pa.int64(), 'int': pa.int64()}
+
+
+def parse_number(arr):
+    """Ubah kolom string Arrow berformat Rupiah/volume menjadi float64 (null bila tak valid)."""
+    s = pc.replace_substring_regex(pc.cast(arr, pa.string()), r'[^0-9.,\-]', '')
+    id_norm = pc.replace_substring(pc.replace_substring(s, '.', ''), ',', '.')
+    us_norm = pc.replace_substring(s, ',', '')
+    s = pc.if_else(pc.match_substring_regex(s, _ID_GROUPED), id_norm,
+                   pc.if_else(pc.match_substring_regex(s, _US_GROUPED), us_norm,
+                              pc.if_else(pc.match_substring_regex(s, _COMMA_DECIMAL), id_norm, s)))
+    s = pc.if_else(pc.match_substring_regex(s, _PLAIN), s, pa.scalar(None, pa.string()))
+    return pc.cast(s, pa.float64())
+
+
+def convert(arr, kind):
+    """Konversi satu kolom string Arrow ke tipe kolom ``kind``; nilai kosong menjadi 0."""
+    values = pc.fill_null(parse_number(arr), 0.0)
+    if kind == 'rupiah':
+        return values
+    return pc.cast(pc.round(values), ARROW_TYPES[kind])
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from helsa import instrument
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(os.environ.get('HELSA_SNAPSHOT_DIR', Path(__file__).resolve().parent.parent / '.snapshot'))
+FETCH_TIMEOUT = 20
+_META_KEY = b'helsa'
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Frame hasil parse beserta hash konten sumber."""
+    frame: object
+    digest: str
+    fetched_at: float
+    etag: str = None
+    last_modified: str = None
+    version: object = None
+    stale: bool = False
+    errors: tuple = ()
+
+    def meta(self):
+        return {'digest': self.digest, 'fetched_at': self.fetched_at, 'etag': self.etag,
+                'last_modified': self.last_modified, 'version': self.version}
+
+
+class SnapshotStore:
+    """Penyimpanan snapshot kolumnar (Arrow IPC) per URL sumber di disk.
+
+    Metadata (hash, ETag) ditulis di schema file yang sama, sehingga data dan
+    metadata selalu terganti bersamaan lewat ``os.replace``.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = Path(root)
+
+    def path(self, url):
+        return self.root / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.arrow"
+
+    def read_meta(self, url):
+        path = self.path(url)
+        if not path.exists():
+            return None
+        try:
+            with pa.memory_map(str(path)) as source:
+                schema = pa.ipc.open_file(source).schema
+            return json.loads(schema.metadata[_META_KEY])
+        except Exception as e:
+            logger.warning("Snapshot %s tidak terbaca: %s", path, e)
+            return None
+
+    def read(self, url):
+        path = self.path(url)
+        if not path.exists():
+            return None
+        try:
+            table = feather.read_table(str(path), memory_map=True)
+            meta = json.loads(table.schema.metadata[_META_KEY])
+            return Snapshot(frame=table.to_pandas(), **meta)
+        except Exception as e:
+            logger.warning("Snapshot %s tidak terbaca: %s", path, e)
+            return None
+
+    def write(self, url, snap):
+        self.root.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(snap.frame, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_META_KEY] = json.dumps(snap.meta()).encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        os.close(fd)
+        try:
+            feather.write_feather(table, tmp, compression='uncompressed')
+            os.replace(tmp, self.path(url))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def fetch(url, meta=None, timeout=FETCH_TIMEOUT):
+    """Unduh bytes sumber; mengembalikan ``(None, headers)`` bila server menjawab 304."""
+    req = urllib.request.Request(url)
+    if meta and meta.get('etag'):
+        req.add_header('If-None-Match', meta['etag'])
+    if meta and meta.get('last_modified'):
+        req.add_header('If-Modified-Since', meta['last_modified'])
+    with instrument.span('fetch') as sp:
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                body = resp.read()
+                sp.set(bytes=len(body))
+                return body, resp.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, e.headers
+            raise
+
+
+def load(url, parse, store=None, timeout=FETCH_TIMEOUT, version=None):
+    """Muat sumber lewat snapshot lokal.
+
+    Parse ulang hanya dilakukan bila bytes sumber berubah (hash SHA-256 berbeda
+    atau server tidak menjawab 304). Bila unduhan gagal, snapshot terakhir
+    dikembalikan dengan ``stale=True``. Snapshot dari ``version`` parser lain
+    tidak dipakai ulang kecuali sebagai cadangan saat unduhan gagal.
+    """
+    store = store or SnapshotStore()
+    meta = store.read_meta(url)
+    reusable = meta is not None and meta.get('version') == version
+    try:
+        raw, headers = fetch(url, meta if reusable else None, timeout)
+    except Exception as e:
+        cached = store.read(url) if meta else None
+        if cached is None:
+            raise
+        logger.warning("Gagal mengunduh %s, memakai snapshot %s: %s", url, cached.digest[:12], e)
+        instrument.count('snapshot.stale')
+        return replace(cached, stale=True)
+
+    if raw is None:
+        cached = store.read(url)
+        if cached is not None:
+            instrument.count('snapshot.hit')
+            return cached
+        raw, headers = fetch(url, None, timeout)
+
+    digest = hashlib.sha256(raw).hexdigest()
+    if reusable and meta.get('digest') == digest:
+        cached = store.read(url)
+        if cached is not None:
+            instrument.count('snapshot.hit')
+            return cached
+
+    instrument.count('snapshot.miss')
+    with instrument.span('parse', bytes=len(raw)) as sp:
+        frame = parse(raw)
+        sp.set(rows=len(frame))
+    snap = Snapshot(frame=frame, digest=digest, fetched_at=time.time(), etag=headers.get('ETag'),
+                    last_modified=headers.get('Last-Modified'), version=version)
+    try:
+        store.write(url, snap)
+    except Exception as e:
+        logger.warning("Gagal menyimpan snapshot %s: %s", url, e)
+    return snap
@@ -0,0 +1,101 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from helsa import snapshot
+from helsa.loader import apply_categories
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class Source:
+    """Satu tab sheet. ``year``/``region`` mengisi kolom Tahun/Wilayah bila tab tidak memilikinya."""
+    url: str
+    year: int = None
+    region: str = None
+    name: str = None
+
+    @property
+    def label(self):
+        return self.name or self.url
+
+
+def gviz_url(sheet_id, sheet_name):
+    return f'https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}'
+
+
+def parse_spec(spec):
+    """Baca daftar sumber dari teks ``url|tahun|wilayah`` (dipisah ``;`` atau baris baru)."""
+    result = []
+    for entry in spec.replace('\n', ';').split(';'):
+        parts = [p.strip() for p in entry.split('|')]
+        if not parts[0]:
+            continue
+        year = int(parts[1]) if len(parts) > 1 and parts[1] else None
+        region = parts[2] if len(parts) > 2 and parts[2] else None
+        result.append(Source(parts[0], year=year, region=region))
+    return result
+
+
+def tag(frame, source):
+    extra = {}
+    if source.year is not None:
+        extra['Tahun'] = frame['Tahun'].fillna(source.year) if 'Tahun' in frame.columns else source.year
+    if source.region is not None and 'Wilayah' not in frame.columns:
+        extra['Wilayah'] = source.region
+    return frame.assign(**extra) if extra else frame
+
+
+def combine(sources, snaps, errors=(), version=None):
+    """Gabungkan snapshot per sumber menjadi satu Snapshot bertipe.
+
+    ``snaps`` sejajar dengan ``sources``; sumber yang ``None`` dilewati. Digest
+    gabungan berubah bila salah satu digest sumber berubah.
+    """
+    parts = [(s, snap) for s, snap in zip(sources, snaps) if snap is not None]
+    if not parts:
+        raise RuntimeError("Semua sumber gagal dimuat: " + "; ".join(f"{name}: {e}" for name, e in errors))
+    if len(parts) == 1:
+        frame = tag(parts[0][1].frame, parts[0][0])
+    else:
+        frame = apply_categories(pd.concat([tag(snap.frame, s) for s, snap in parts], ignore_index=True))
+    digest = hashlib.sha256('|'.join(f"{s.url}={snap.digest}" for s, snap in parts).encode('utf-8')).hexdigest()
+    return snapshot.Snapshot(
+        frame=frame, digest=digest, fetched_at=min(snap.fetched_at for _, snap in parts), version=version,
+        stale=any(snap.stale for _, snap in parts), errors=tuple(errors),
+    )
+
+
+def load_all(sources, parse, store=None, version=None, max_workers=MAX_WORKERS, timeout=snapshot.FETCH_TIMEOUT):
+    """Unduh & parse semua sumber secara paralel (maks. ``max_workers`` sekaligus).
+
+    Kegagalan ditangani per sumber: sumber yang gagal tanpa snapshot lokal
+    dilewati dan dicatat di ``Snapshot.errors``, sumber lain tetap ditampilkan.
+    """
+    store = store or snapshot.SnapshotStore()
+    snaps, errors = [None] * len(sources), []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources))), thread_name_prefix='helsa-source') as pool:
+        futures = [pool.submit(snapshot.load, s.url, parse, store, timeout, version) for s in sources]
+        for i, (source, future) in enumerate(zip(sources, futures)):
+            try:
+                snaps[i] = future.result()
+            except Exception as e:
+                logger.warning("Sumber %s gagal dimuat: %s", source.label, e)
+                errors.append((source.label, str(e)))
+    return combine(sources, snaps, errors, version)
+
+
+def read_cached(sources, store=None, version=None):
+    """Gabungan snapshot disk saja (tanpa jaringan); ``None`` bila belum ada satu pun."""
+    store = store or snapshot.SnapshotStore()
+    snaps = [store.read(s.url) for s in sources]
+    snaps = [snap if snap is not None and snap.version == version else None for snap in snaps]
+    if not any(snaps):
+        return None
+    return combine(sources, snaps, version=version)
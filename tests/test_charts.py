@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import charts
+from bench.synth import generate
+from helsa import metrics
+from helsa.loader import parse_csv
+
+
+@pytest.fixture(scope='module')
+def top():
+    df = metrics.enrich(parse_csv(generate(30, (2024, 2025), seed=5)))
+    return metrics.top_branches(df, 8)
+
+
+def test_color_known_generated_and_others():
+    assert charts.color('Cikampek') == charts.COLORS['Cikampek']
+    assert charts.color(metrics.OTHERS) == charts.DEFAULT_COLOR
+    generated = charts.color('Cabang 77')
+    assert set(generated) == {'base', 'light', 'dark'}
+    assert generated == charts.color('Cabang 77')
+    assert generated != charts.color('Cabang 78')
+
+
+@pytest.mark.parametrize('chart_id', list(charts.STACKED_CHARTS))
+def test_stacked_compact_has_one_trace_per_layer(top, chart_id):
+    frame, branches = top
+    fig = charts.build_stacked_compact(frame, branches, **charts.STACKED_CHARTS[chart_id])
+    assert len(fig.data) == 2
+    assert len(fig.data[0].x[0]) == len(frame)
+    # Bulan pertama tidak punya growth: label kosong, bukan 0%.
+    first = frame['Periode'].min()
+    labels = fig.data[1].text
+    assert all(t == '' for t, p in zip(labels, np.sort(frame['Periode'].to_numpy())) if p == first)
+
+
+def test_compact_revenue_ticks_in_miliar(top):
+    frame, branches = top
+    fig = charts.build_stacked_compact(frame, branches, **charts.STACKED_CHARTS['revenue'])
+    assert all(t.endswith('M') for t in fig.layout.yaxis.ticktext)
+
+
+def test_capacity_compact(top):
+    frame, branches = top
+    fig = charts.build_capacity_compact(frame, branches)
+    assert [t.type for t in fig.data] == ['bar', 'scatter']
+    assert fig.data[0].y.sum() == frame['Kapasitas Maks'].sum()
+
+
+def test_heatmap_grid(top):
+    frame, branches = top
+    fig = charts.build_heatmap(frame, branches, 'Utilisasi Poli', 'RdYlGn', '%')
+    z = np.asarray(fig.data[0].z, dtype=float)
+    assert z.shape == (len(branches), frame['Periode'].nunique())
+    assert list(fig.data[0].y) == branches
+    row = frame[frame['Cabang'] == branches[0]].sort_values('Periode')
+    np.testing.assert_allclose(z[0], row['Utilisasi Poli'].to_numpy(dtype=float), rtol=1e-6)
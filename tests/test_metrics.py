@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench.synth import generate
+from helsa import metrics
+from helsa.loader import parse_csv
+
+REVENUE = 'Actual Revenue (Total)'
+SUMMED = [REVENUE, 'Target Revenue', 'Total OPT', 'Total IGD', 'Total IGD to IPT', 'Kapasitas Maks']
+
+
+@pytest.fixture(scope='module')
+def enriched():
+    return metrics.enrich(parse_csv(generate(12, (2024, 2025), seed=3)))
+
+
+def ranked(df):
+    return df.groupby('Cabang', observed=True)[REVENUE].sum().sort_values(ascending=False, kind='stable')
+
+
+def test_top_branches_order_and_others_last(enriched):
+    frame, branches = metrics.top_branches(enriched, 5)
+    assert branches == list(ranked(enriched).index[:5]) + [metrics.OTHERS]
+    assert list(frame['Cabang'].cat.categories) == branches
+    assert set(frame['Cabang'].astype(object)) == set(branches)
+
+
+def test_others_rows_are_per_period_sum_of_folded_branches(enriched):
+    frame, branches = metrics.top_branches(enriched, 5)
+    folded = enriched[~enriched['Cabang'].isin(branches[:-1])]
+    expected = folded.groupby('Periode')[SUMMED].sum()
+    others = frame[frame['Cabang'] == metrics.OTHERS].set_index('Periode')[SUMMED]
+    pd.testing.assert_frame_equal(others.astype(float), expected.astype(float), check_names=False, check_index_type=False)
+    # Rasio dihitung ulang dari total, bukan dirata-rata.
+    cr = frame[frame['Cabang'] == metrics.OTHERS]['CR IGD to IPT'].to_numpy()
+    np.testing.assert_allclose(cr, (expected['Total IGD to IPT'] / expected['Total IGD'] * 100).to_numpy())
+
+
+def test_totals_are_preserved(enriched):
+    frame, _ = metrics.top_branches(enriched, 5)
+    for col in SUMMED:
+        assert frame[col].sum() == pytest.approx(enriched[col].sum())
+
+
+def test_unchanged_when_branches_fit(enriched):
+    subset = metrics.select(enriched, branches=list(enriched['Cabang'].unique()[:4]))
+    frame, branches = metrics.top_branches(subset, 5)
+    assert frame is subset
+    assert branches == list(subset['Cabang'].unique())
+
+
+def test_extra_text_columns_are_carried(enriched):
+    raw = parse_csv(generate(12, (2025,), seed=4))
+    raw['Wilayah'] = 'Jabar'
+    raw['Keterangan'] = [f'catatan {i}' for i in range(len(raw))]
+    frame, branches = metrics.top_branches(metrics.enrich(raw), 5)
+    others = frame[frame['Cabang'] == metrics.OTHERS]
+    assert len(others) == 12
+    assert (others['Wilayah'] == 'Jabar').all()
+    assert others['Keterangan'].isna().all()
+
+
+def brute_growth(df, col, cabang, year, month):
+    """Growth dihitung manual terhadap bulan kalender sebelumnya (NaN bila tidak ada)."""
+    prev_year, prev_month = (year - 1, 12) if month == 1 else (year, month - 1)
+    rows = {(int(r.Tahun), int(r.Bulan_No)): float(r[col]) for _, r in df[df['Cabang'] == cabang].iterrows()}
+    if (prev_year, prev_month) not in rows:
+        return np.nan
+    return (rows[(year, month)] / rows[(prev_year, prev_month)] - 1) * 100
+
+
+@pytest.mark.parametrize('col', metrics.GROWTH_COLS)
+def test_growth_for_non_contiguous_selection(enriched, col):
+    view = metrics.select(enriched, months=['Januari', 'Maret'], years=[2025])
+    for _, row in view.iterrows():
+        expected = brute_growth(enriched, col, row['Cabang'], int(row['Tahun']), int(row['Bulan_No']))
+        assert row[f'{col}_Growth'] == pytest.approx(expected, rel=1e-5)
+
+
+def test_growth_across_year_boundary(enriched):
+    view = metrics.select(enriched, months=['Januari'], years=[2025])
+    assert len(view) == enriched['Cabang'].nunique()
+    for _, row in view.iterrows():
+        expected = brute_growth(enriched, REVENUE, row['Cabang'], 2025, 1)
+        assert not np.isnan(expected)
+        assert row[f'{REVENUE}_Growth'] == pytest.approx(expected, rel=1e-5)
+
+
+def test_growth_without_previous_month_is_nan():
+    raw = parse_csv(generate(2, (2025,), seed=6))
+    branch = raw['Cabang'].iloc[0]
+    raw = raw[~((raw['Cabang'] == branch) & (raw['Bulan'] == 'Februari'))]
+    df = metrics.enrich(raw)
+    growth = df.set_index(['Cabang', 'Bulan'], drop=False)[f'{REVENUE}_Growth']
+    assert np.isnan(growth[(branch, 'Januari')])
+    assert np.isnan(growth[(branch, 'Maret')])
+    other = next(cb for cb in df['Cabang'].unique() if cb != branch)
+    assert growth[(other, 'Maret')] == pytest.approx(brute_growth(df, REVENUE, other, 2025, 3), rel=1e-5)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from helsa.periods import PERIOD_METRICS, PeriodIndex, period
+
+FIRST, LAST = period(2024, 11), period(2025, 6)
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.default_rng(0)
+    rows = []
+    for cabang, skip in (('A', set()), ('B', {period(2025, 2), period(2025, 3)})):
+        for p in range(FIRST, LAST + 1):
+            if p in skip:
+                continue
+            rows.append({'Cabang': cabang, 'Periode': p, **{col: float(rng.integers(1, 1000)) for col in PERIOD_METRICS.values()}})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope='module')
+def index(frame):
+    return PeriodIndex(frame)
+
+
+def brute(frame, col, start, end):
+    rows = frame[(frame['Periode'] >= start) & (frame['Periode'] <= end)]
+    return rows.groupby('Cabang')[col].sum().reindex(['A', 'B'], fill_value=0.0)
+
+
+RANGES = [(FIRST, LAST), (period(2025, 1), period(2025, 3)), (period(2025, 4), period(2025, 4)), (period(2024, 12), period(2025, 2))]
+
+
+@pytest.mark.parametrize('start, end', RANGES)
+@pytest.mark.parametrize('key', list(PERIOD_METRICS))
+def test_total_matches_groupby(frame, index, key, start, end):
+    np.testing.assert_allclose(index.total(key, start, end).to_numpy(), brute(frame, PERIOD_METRICS[key], start, end).to_numpy())
+
+
+@pytest.mark.parametrize('start, end', RANGES)
+def test_average_and_achievement(frame, index, start, end):
+    rows = frame[(frame['Periode'] >= start) & (frame['Periode'] <= end)]
+    months = rows.groupby('Cabang').size().reindex(['A', 'B'], fill_value=0)
+    revenue = brute(frame, PERIOD_METRICS['revenue'], start, end)
+    target = brute(frame, PERIOD_METRICS['target'], start, end)
+    np.testing.assert_array_equal(index.months(start, end).to_numpy(), months.to_numpy())
+    np.testing.assert_allclose(index.average('revenue', start, end).to_numpy(), (revenue / months.where(months > 0)).to_numpy())
+    np.testing.assert_allclose(index.achievement(start, end).to_numpy(), (revenue / target * 100).to_numpy())
+
+
+def test_branch_with_gaps(frame, index):
+    gap = (period(2025, 2), period(2025, 3))
+    assert index.months(*gap).to_dict() == {'A': 2, 'B': 0}
+    assert index.total('revenue', *gap)['B'] == 0
+    assert np.isnan(index.average('revenue', *gap)['B'])
+    assert np.isnan(index.achievement(*gap)['B'])
+    # Rentang yang melintasi celah hanya menghitung bulan berisi data.
+    assert index.months(period(2025, 1), period(2025, 4))['B'] == 2
+
+
+def test_ytd_qtd_rolling_at_boundaries(frame, index):
+    jan, apr = period(2025, 1), period(2025, 4)
+    col = PERIOD_METRICS['opt']
+    np.testing.assert_allclose(index.ytd('opt', jan).to_numpy(), brute(frame, col, jan, jan).to_numpy())
+    np.testing.assert_allclose(index.qtd('opt', apr).to_numpy(), brute(frame, col, apr, apr).to_numpy())
+    np.testing.assert_allclose(index.ytd('opt', apr).to_numpy(), brute(frame, col, jan, apr).to_numpy())
+    np.testing.assert_allclose(index.qtd('opt', period(2025, 6)).to_numpy(), brute(frame, col, apr, period(2025, 6)).to_numpy())
+    # Jendela rolling di awal data terpotong pada periode pertama.
+    np.testing.assert_allclose(index.rolling('opt', FIRST, 3).to_numpy(), brute(frame, col, FIRST, FIRST).to_numpy())
+    np.testing.assert_allclose(index.rolling('opt', period(2025, 1), 3).to_numpy(), brute(frame, col, FIRST, period(2025, 1)).to_numpy())
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (FIRST - 24, LAST + 24, (FIRST, LAST)),
+    (FIRST - 5, period(2025, 1), (FIRST, period(2025, 1))),
+    (period(2025, 5), LAST + 5, (period(2025, 5), LAST)),
+    (FIRST - 10, FIRST - 1, None),
+    (LAST + 1, LAST + 10, None),
+    (period(2025, 3), period(2025, 1), None),
+])
+def test_ranges_outside_data_are_clamped(frame, index, start, end, expected):
+    result = index.total('revenue', start, end).to_numpy()
+    if expected is None:
+        np.testing.assert_array_equal(result, [0.0, 0.0])
+    else:
+        np.testing.assert_allclose(result, brute(frame, PERIOD_METRICS['revenue'], *expected).to_numpy())
+
+
+def test_compare(frame, index):
+    a, b = (period(2025, 4), period(2025, 6)), (period(2025, 1), period(2025, 3))
+    table = index.compare('ipt', a, b)
+    col = PERIOD_METRICS['ipt']
+    np.testing.assert_allclose(table['A'].to_numpy(), brute(frame, col, *a).to_numpy())
+    np.testing.assert_allclose(table['Perubahan (%)'].to_numpy(),
+                               ((brute(frame, col, *a) / brute(frame, col, *b) - 1) * 100).to_numpy())
@@ -0,0 +1,47 @@
+import pyarrow as pa
+import pytest
+
+from helsa.loader import parse_csv
+from helsa.schema import convert, parse_number
+
+
+@pytest.mark.parametrize('raw, expected', [
+    # Pemisah yang diikuti tepat 3 digit adalah pemisah ribuan.
+    ('1.234', 1234.0),
+    ('1,234', 1234.0),
+    ('-2.500', -2500.0),
+    ('1.234.567,89', 1234567.89),
+    ('1,234,567.89', 1234567.89),
+    # Koma dengan digit selain 3 adalah desimal; titik tanpa pengelompokan juga.
+    ('12,5', 12.5),
+    ('1234,5', 1234.5),
+    ('1234.5', 1234.5),
+    ('1234', 1234.0),
+    # Simbol mata uang & spasi dibuang.
+    ('Rp1.000.000,00', 1000000.0),
+    ('Rp 1.234.567', 1234567.0),
+    (' 42 ', 42.0),
+])
+def test_parse_number(raw, expected):
+    assert parse_number(pa.array([raw])).to_pylist() == [pytest.approx(expected)]
+
+
+@pytest.mark.parametrize('raw', ['1.234.5', '1,234.567,8', 'abc', '', None])
+def test_parse_number_invalid_is_null(raw):
+    assert parse_number(pa.array([raw], pa.string())).to_pylist() == [None]
+
+
+def test_convert_fills_null_and_casts():
+    arr = pa.array(['1.234', '', None, 'x', '12,5', '2.500,75'], pa.string())
+    assert convert(arr, 'rupiah').to_pylist() == [1234.0, 0.0, 0.0, 0.0, 12.5, 2500.75]
+    volume = convert(arr, 'volume')
+    assert volume.type == pa.int64()
+    # Pembulatan Arrow default: half-to-even.
+    assert volume.to_pylist() == [1234, 0, 0, 0, 12, 2501]
+
+
+def test_parse_csv_requires_key_columns():
+    with pytest.raises(ValueError, match='HTML'):
+        parse_csv(b'<html><body>Sign in</body></html>')
+    with pytest.raises(ValueError, match='Bulan'):
+        parse_csv(b'Cabang,Target Revenue\nCikampek,1\n')
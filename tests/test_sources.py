@@ -0,0 +1,148 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bench.synth import generate
+from helsa import instrument, snapshot
+from helsa.loader import PARSER_VERSION, parse_csv
+from helsa.sources import Source, load_all
+
+CSV_A = generate(2, (2025,), seed=1)
+CSV_B = generate(3, (2024,), seed=2)
+
+
+class StandIn:
+    """Server HTTP lokal pengganti Google Sheets: ``routes`` memetakan path ke bytes."""
+
+    def __init__(self, routes):
+        routes = dict(routes)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = routes.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(routes):
+        servers.append(StandIn(routes))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def counters():
+    was_enabled = instrument.enabled()
+    instrument.enable(True)
+    instrument.reset()
+    yield instrument.counters
+    instrument.reset()
+    instrument.enable(was_enabled)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return snapshot.SnapshotStore(tmp_path)
+
+
+def test_missing_source_is_skipped_and_recorded(stand_in, store):
+    server = stand_in({'/a.csv': CSV_A})
+    sources = [Source(server.url('/a.csv'), year=2025, name='a'), Source(server.url('/missing.csv'), year=2024, name='missing')]
+    snap = load_all(sources, parse_csv, store, version=PARSER_VERSION, timeout=5)
+    assert len(snap.frame) == len(parse_csv(CSV_A))
+    assert [name for name, _ in snap.errors] == ['missing']
+    assert '404' in snap.errors[0][1]
+    assert not snap.stale
+
+
+def test_sources_are_combined(stand_in, store):
+    server = stand_in({'/a.csv': CSV_A, '/b.csv': CSV_B})
+    sources = [Source(server.url('/a.csv'), year=2025), Source(server.url('/b.csv'), year=2024)]
+    snap = load_all(sources, parse_csv, store, version=PARSER_VERSION, timeout=5)
+    assert snap.errors == ()
+    assert sorted(snap.frame['Tahun'].unique().tolist()) == [2024, 2025]
+    assert len(snap.frame) == len(parse_csv(CSV_A)) + len(parse_csv(CSV_B))
+
+
+def test_all_sources_failing_raises(stand_in, store):
+    server = stand_in({})
+    with pytest.raises(RuntimeError):
+        load_all([Source(server.url('/missing.csv'))], parse_csv, store, version=PARSER_VERSION, timeout=5)
+
+
+def test_unchanged_digest_is_a_snapshot_hit(stand_in, store, counters):
+    url = stand_in({'/a.csv': CSV_A}).url('/a.csv')
+    first = snapshot.load(url, parse_csv, store, timeout=5, version=PARSER_VERSION)
+    second = snapshot.load(url, parse_csv, store, timeout=5, version=PARSER_VERSION)
+    assert second.digest == first.digest
+    assert counters().get('snapshot.miss') == 1
+    assert counters().get('snapshot.hit') == 1
+    assert second.frame.equals(first.frame)
+
+
+def test_parser_version_change_reparses(stand_in, store, counters):
+    url = stand_in({'/a.csv': CSV_A}).url('/a.csv')
+    snapshot.load(url, parse_csv, store, timeout=5, version='old')
+    snap = snapshot.load(url, parse_csv, store, timeout=5, version=PARSER_VERSION)
+    assert counters().get('snapshot.miss') == 2
+    assert snap.version == PARSER_VERSION
+
+
+def test_unreachable_source_serves_stale_snapshot(stand_in, store, counters):
+    server = stand_in({'/a.csv': CSV_A})
+    url = server.url('/a.csv')
+    fresh = snapshot.load(url, parse_csv, store, timeout=5, version=PARSER_VERSION)
+    server.close()
+    stale = snapshot.load(url, parse_csv, store, timeout=2, version=PARSER_VERSION)
+    assert stale.stale
+    assert stale.digest == fresh.digest
+    assert stale.frame.equals(fresh.frame)
+    assert counters().get('snapshot.stale') == 1
+
+
+def test_unreachable_source_without_snapshot_raises(stand_in, store):
+    server = stand_in({})
+    url = server.url('/a.csv')
+    server.close()
+    with pytest.raises(OSError):
+        snapshot.load(url, parse_csv, store, timeout=2, version=PARSER_VERSION)
+
+
+@pytest.mark.parametrize('body', [
+    b'<!DOCTYPE html><html><head><title>Sign in - Google Accounts</title></head><body></body></html>',
+    b'Nama,Nilai\nfoo,1\n',
+])
+def test_non_sheet_response_is_recorded(stand_in, store, body):
+    server = stand_in({'/a.csv': CSV_A, '/login': body})
+    sources = [Source(server.url('/a.csv'), year=2025, name='a'), Source(server.url('/login'), year=2024, name='private')]
+    snap = load_all(sources, parse_csv, store, version=PARSER_VERSION, timeout=5)
+    assert len(snap.frame) == len(parse_csv(CSV_A))
+    assert [name for name, _ in snap.errors] == ['private']
+    assert 'Cabang' in snap.errors[0][1]